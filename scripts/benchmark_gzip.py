@@ -0,0 +1,71 @@
+"""
+Compare reading a gzipped file through `open_resource` with `gzip.open(fh, "rt")`
+
+open_resource decompresses gzip with ISA-L or zlib-ng when either is installed
+(`pip install koza[fast-gzip]`), and falls back to the gzip module otherwise.
+
+Usage:
+    python scripts/benchmark_gzip.py [file.gz] [--repeat N]
+
+Without a file, a ~150 MB (uncompressed) TSV is generated in a temporary directory.
+"""
+
+import argparse
+import gzip
+import tempfile
+import time
+from pathlib import Path
+
+from koza.io.utils import GZIP_BACKEND, open_resource
+
+
+def generate(path: Path, rows: int = 2_000_000):
+    with gzip.open(path, "wt", compresslevel=6) as fh:
+        fh.write("id\tname\tcategory\tscore\tdescription\n")
+        for i in range(rows):
+            fh.write(f"EX:{i}\tname {i}\tbiolink:Gene\t{i % 1000 / 7:.4f}\tsome description of row {i}\n")
+
+
+def read_gzip_module(path: Path) -> int:
+    with path.open("rb") as fh, gzip.open(fh, "rt") as reader:
+        return sum(1 for _ in reader)
+
+
+def read_open_resource(path: Path) -> int:
+    resource = open_resource(path)
+    assert not isinstance(resource, tuple)
+    with resource.reader as reader:
+        return sum(1 for _ in reader)
+
+
+def best_of(fn, path: Path, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", nargs="?", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = args.file
+        if path is None:
+            path = Path(tmp_dir) / "benchmark.tsv.gz"
+            generate(path)
+
+        size = path.stat().st_size / 1e6
+        print(f"{path.name}: {size:.1f} MB compressed, backend {GZIP_BACKEND}")
+        baseline = best_of(read_gzip_module, path, args.repeat)
+        print(f'gzip.open(fh, "rt"): {baseline:.2f}s ({size / baseline:.1f} MB/s)')
+        resource = best_of(read_open_resource, path, args.repeat)
+        print(f"open_resource:       {resource:.2f}s ({size / resource:.1f} MB/s, {baseline / resource:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure how many rows per second `RowFilter` checks against a large `in` allow-list
+
+The compiled filter is compared with checking each row against the filter values one
+at a time, which is how filters were previously applied. The allow-list is made of
+taxon identifiers, like the taxon filters of many ingests.
+
+Usage:
+    python scripts/benchmark_row_filter.py [--values N] [--rows N] [--code in|in_exact]
+"""
+
+import argparse
+import random
+import time
+
+from koza.model.filters import InListFilter
+from koza.utils.row_filter import RowFilter
+
+
+def linear_inlist(column_value, filter_values, exact: bool) -> bool:
+    if column_value in filter_values:
+        return True
+    if exact or not isinstance(column_value, str):
+        return False
+    return any(filter_value in column_value for filter_value in filter_values)
+
+
+def rows_per_second(include_row, rows) -> tuple[float, int]:
+    start = time.perf_counter()
+    included = sum(1 for row in rows if include_row(row))
+    return len(rows) / (time.perf_counter() - start), included
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--values", type=int, default=10_000, help="Number of values in the allow-list")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--code", choices=["in", "in_exact"], default="in")
+    args = parser.parse_args()
+
+    rng = random.Random(0)  # noqa: S311 - benchmark data, not cryptography
+    taxa = [f"NCBITaxon:{rng.randrange(10**7)}" for _ in range(args.values)]
+    # Roughly one row in ten is in the allow-list, as with filtering to a few taxa
+    rows = [
+        {"id": f"EX:{i}", "taxon": rng.choice(taxa) if i % 10 == 0 else f"NCBITaxon:{10**7 + i}"}
+        for i in range(args.rows)
+    ]
+
+    column_filter = InListFilter(column="taxon", inclusion="include", filter_code=args.code, value=taxa)
+    compiled = RowFilter([column_filter]).include_row
+
+    exact = args.code == "in_exact"
+
+    def linear(row):
+        return linear_inlist(row["taxon"], taxa, exact)
+
+    print(f"`{args.code}` filter with {args.values} values, {args.rows} rows")
+    linear_rate, linear_included = rows_per_second(linear, rows)
+    print(f"linear scan: {linear_rate:12,.0f} rows/s")
+    compiled_rate, compiled_included = rows_per_second(compiled, rows)
+    print(f"RowFilter:   {compiled_rate:12,.0f} rows/s ({compiled_rate / linear_rate:.0f}x)")
+    assert compiled_included == linear_included
+
+
+if __name__ == "__main__":
+    main()
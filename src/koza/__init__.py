@@ -1,6 +1,6 @@
 from importlib import metadata
 
-from koza.decorators import on_data_begin, on_data_end, prepare_data, transform, transform_record
+from koza.decorators import on_data_begin, on_data_end, prepare_data, transform, transform_batch, transform_record
 from koza.model.koza import KozaConfig
 from koza.runner import KozaRunner, KozaTransform
 
@@ -13,6 +13,7 @@ __all__ = (
     "prepare_data",
     "transform",
     "transform_record",
+    "transform_batch",
     "on_data_begin",
     "on_data_end",
 )
@@ -0,0 +1,230 @@
+"""
+Run many ingest configs in one go, e.g. for a full KG build.
+
+Every ingest runs in its own process so that they can't interfere with each other
+(transform modules, loguru handlers, `koza.state`), but those processes are forked
+from a server that has already imported koza and the Biolink model, so each ingest
+skips the interpreter startup and import cost of a separate `koza transform` call.
+"""
+
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import yaml
+from loguru import logger
+
+from koza.io.yaml_loader import UniqueIncludeLoader
+from koza.model.formats import OutputFormat
+from koza.model.source import Source
+from koza.runner import KozaRunner
+
+# Modules imported once in the fork server, rather than once per ingest
+PRELOAD_MODULES = ["__main__", "koza.main", "biolink_model.datamodel.pydanticmodel_v2"]
+
+#: Whether process pools can replace each worker after one task (`max_tasks_per_child` is new in python 3.11)
+POOL_REPLACES_WORKERS = sys.version_info >= (3, 11)
+
+
+@dataclass
+class IngestResult:
+    config: str
+    name: str | None = None
+    rows: int = 0
+    node_count: int = 0
+    edge_count: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def expand_config_patterns(patterns: list[str]) -> list[str]:
+    """Expand glob patterns into a list of config files, keeping the given order.
+
+    Patterns without any matches are kept as-is, so that a missing config is reported
+    as a failed ingest rather than silently skipped.
+    """
+    config_files: list[str] = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) or [pattern]
+        for match in matches:
+            if match not in config_files:
+                config_files.append(match)
+    return config_files
+
+
+def run_ingest(
+    config_file: str,
+    output_dir: str = "",
+    output_format: OutputFormat | None = None,
+    row_limit: int = 0,
+    log_level: str | None = "INFO",
+) -> IngestResult:
+    """Run a single ingest config and summarize it. Errors are recorded, not raised."""
+    logger.remove()
+    if log_level is not None:
+        logger.configure(extra={"config": config_file})
+        prompt = "{time:YYYY-MM-DD HH:mm:ss.SSS} | <level>{level}</level> | {extra[config]} | <level>{message}</level>"
+        logger.add(sys.stderr, format=prompt, colorize=True, level=log_level)
+
+    result = IngestResult(config=config_file)
+    start = time.perf_counter()
+    try:
+        config, runner = KozaRunner.from_config_file(
+            config_file,
+            output_dir=output_dir,
+            output_format=output_format,
+            row_limit=row_limit,
+        )
+        result.name = config.name
+        writer = runner.run()
+        result.node_count = writer.node_count
+        result.edge_count = writer.edge_count
+        result.rows = sum(data.num_rows for data in runner.data.values() if isinstance(data, Source))
+    except Exception:
+        result.error = traceback.format_exc()
+        logger.error(f"Transform failed:\n{result.error}")
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def _get_context() -> multiprocessing.context.BaseContext:
+    try:
+        context = multiprocessing.get_context("forkserver")
+    except ValueError:
+        # No forkserver (e.g. on Windows): every ingest pays for its own imports
+        return multiprocessing.get_context("spawn")
+    context.set_forkserver_preload(PRELOAD_MODULES)
+    return context
+
+
+def _config_name(config_file: str) -> str | None:
+    """Read the name of an ingest config, or None if it can't be read (its ingest then reports why)"""
+    try:
+        with open(config_file) as fh:
+            config_dict = yaml.load(fh, Loader=UniqueIncludeLoader.with_file_base(config_file))  # noqa: S506
+    except Exception:
+        return None
+    return config_dict.get("name") if isinstance(config_dict, dict) else None
+
+
+def _run_ingest_in_new_process(context: multiprocessing.context.BaseContext, *args: Any) -> IngestResult:
+    """Run an ingest in a process of its own, for pythons whose pools can't replace their workers"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_ingest, *args).result()
+
+
+def run_ingests(
+    config_files: list[str],
+    output_dir: str = "",
+    output_format: OutputFormat | None = None,
+    row_limit: int = 0,
+    concurrency: int | None = None,
+    log_level: str | None = "INFO",
+) -> list[IngestResult]:
+    """Run ingest configs in a pool of at most `concurrency` processes.
+
+    Each ingest gets a fresh process (forked from a preloaded fork server where
+    available). Results are returned in the order of `config_files`; an ingest that
+    fails, or whose process dies, is reported with its error instead of stopping the
+    others. Since every ingest writes to `output_dir`, a config with the same name as
+    an earlier one would overwrite its outputs, so it is reported as failed and not run.
+    """
+    results: dict[int, IngestResult] = {}
+    config_files_by_name: dict[str, str] = {}
+    to_run: list[tuple[int, str]] = []
+    for i, config_file in enumerate(config_files):
+        name = _config_name(config_file)
+        if name is not None and name in config_files_by_name:
+            results[i] = IngestResult(
+                config=config_file,
+                name=name,
+                error=f"{config_files_by_name[name]} has the same name, `{name}`, so would write the same outputs",
+            )
+            continue
+        if name is not None:
+            config_files_by_name[name] = config_file
+        to_run.append((i, config_file))
+
+    context = _get_context()
+    args = (output_dir, output_format, row_limit, log_level)
+    executor: Executor
+    if POOL_REPLACES_WORKERS:
+        executor = ProcessPoolExecutor(max_workers=concurrency, mp_context=context, max_tasks_per_child=1)
+    else:
+        # Start each ingest's process from a thread instead, so it still gets a fresh one
+        executor = ThreadPoolExecutor(max_workers=concurrency or os.cpu_count())
+
+    with executor:
+        futures: list[tuple[int, str, Future[IngestResult]]] = [
+            (
+                i,
+                config_file,
+                executor.submit(run_ingest, config_file, *args)
+                if POOL_REPLACES_WORKERS
+                else executor.submit(_run_ingest_in_new_process, context, config_file, *args),
+            )
+            for i, config_file in to_run
+        ]
+        for i, config_file, future in futures:
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = IngestResult(config=config_file, error=f"{type(e).__name__}: {e}")
+    return [results[i] for i in range(len(config_files))]
+
+
+def format_summary(results: list[IngestResult]) -> str:
+    """Render a plain text table of ingest results."""
+    headers = ["config", "status", "rows", "nodes", "edges", "seconds"]
+    rows = [
+        [
+            result.config,
+            "ok" if result.ok else "FAILED",
+            str(result.rows),
+            str(result.node_count),
+            str(result.edge_count),
+            f"{result.seconds:.2f}",
+        ]
+        for result in results
+    ]
+    rows.append(
+        [
+            "total",
+            f"{sum(not result.ok for result in results)} failed",
+            str(sum(result.rows for result in results)),
+            str(sum(result.node_count for result in results)),
+            str(sum(result.edge_count for result in results)),
+            f"{sum(result.seconds for result in results):.2f}",
+        ]
+    )
+
+    widths = [max(len(row[i]) for row in [headers, *rows]) for i in range(len(headers))]
+    lines = []
+    for row in [headers, *rows]:
+        cells = [
+            cell.ljust(width) if i < 2 else cell.rjust(width)
+            for i, (cell, width) in enumerate(zip(row, widths, strict=True))
+        ]
+        lines.append("  ".join(cells).rstrip())
+    return "\n".join(lines)
+
+
+def write_summary(results: list[IngestResult], path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fh:
+        json.dump([result.as_dict() for result in results], fh, indent=2)
@@ -129,6 +129,57 @@ def transform_record(tag: Tag = None):
     return decorator
 
 
+# @koza.transform_batch()
+# Mark a function as being a function to transform batches of records
+class KozaBatchTransformFunction(KozaTransformHook):
+    def __init__(self, fn: Callable[..., Any], tag: Tag, batch_size: int, columnar: bool):
+        super().__init__(fn, tag)
+        self.batch_size = batch_size
+        self.columnar = columnar
+
+    def __call__(self, koza: KozaTransform, batch: list[Record] | dict[str, list[Any]]) -> Iterable | None:
+        return self.fn(koza, batch)
+
+
+def transform_batch(tag: Tag = None, batch_size: int = 1000, columnar: bool = False):
+    """
+    Decorator to mark a batch transformation function.
+
+    This function will be called with lists of (at most) `batch_size` records for
+    a configured reader, and may return an iterable of entities (or a
+    `KnowledgeGraph`) to write for the whole batch. This avoids per-record
+    overhead for simple mapping transforms and lets lookups be vectorized.
+
+    With `columnar=True`, each batch is instead passed as a dict of column name to
+    the list of that column's values (`None` where a record lacks the column).
+
+    Usage:
+
+        @koza.transform_batch(batch_size=5000)
+        def transform_rows(koza: KozaTransform, records: list[dict[str, Any]]):
+            return [
+                MyOutputObject(name=record["name"], label=record["label"])
+                for record in records
+            ]
+
+        @koza.transform_batch(columnar=True)
+        def transform_columns(koza: KozaTransform, columns: dict[str, list[Any]]):
+            labels = lookup_labels(columns["name"])
+            ...
+
+    :param tag: The tag with which this hook should be associated.
+    :param batch_size: The maximum number of records in each batch.
+    :param columnar: Pass each batch as a dict of lists rather than a list of dicts.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    def decorator(fn: Callable[[KozaTransform, Any], Iterable | None]):
+        return KozaBatchTransformFunction(fn, tag, batch_size, columnar)
+
+    return decorator
+
+
 # @koza.on_data_begin()
 # Mark a function as being called before the reader starts
 class KozaDataBeginFunction(KozaTransformHook):
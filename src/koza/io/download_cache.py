@@ -0,0 +1,145 @@
+"""
+An on-disk cache of remote files
+
+Files are streamed to disk in chunks and kept in a cache directory, keyed by
+URL, so that later runs only revalidate them with the server (using the ETag and
+Last-Modified headers of the original response) instead of downloading them
+again. When the cache grows past its size limit, the least recently used files
+are evicted.
+
+The cache directory is `$KOZA_CACHE_DIR`, or `koza/downloads` in `$XDG_CACHE_HOME`
+(`~/.cache` by default), and its size limit is `$KOZA_CACHE_SIZE` bytes (10 GiB
+by default).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import requests
+from loguru import logger
+
+DEFAULT_CACHE_SIZE = 10 * 1024**3
+
+# Bytes of the response written to disk at a time
+CHUNK_SIZE = 1024 * 1024
+
+REQUEST_TIMEOUT = 30
+
+
+def default_cache_dir() -> Path:
+    if "KOZA_CACHE_DIR" in os.environ:
+        return Path(os.environ["KOZA_CACHE_DIR"])
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "koza" / "downloads"
+
+
+def default_cache_size() -> int:
+    return int(os.environ.get("KOZA_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _read_metadata(metadata_path: Path) -> dict[str, Any]:
+    try:
+        return json.loads(metadata_path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_atomic(path: Path, write) -> None:
+    """Write a file through a temporary file in the same directory, so it is never seen half written"""
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp_file:
+        try:
+            write(tmp_file)
+        except BaseException:
+            tmp_file.close()
+            os.unlink(tmp_file.name)
+            raise
+    os.replace(tmp_file.name, path)
+
+
+def download(url: str, cache_dir: Path | None = None, max_size: int | None = None) -> Path:
+    """
+    Fetch a remote file into the cache, reusing the cached copy if the server
+    reports that it hasn't changed
+
+    If the server can't be reached, a cached copy is used as it is.
+
+    :param url: The URL of the file
+    :param cache_dir: The cache directory (see `default_cache_dir`)
+    :param max_size: The size in bytes past which least recently used files are evicted
+    :return: The path of the cached file
+    """
+    cache_dir = cache_dir or default_cache_dir()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    key = _cache_key(url)
+    data_path = cache_dir / key
+    metadata_path = cache_dir / f"{key}.json"
+
+    headers = {}
+    metadata = _read_metadata(metadata_path) if data_path.exists() else {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
+    except requests.ConnectionError:
+        if not data_path.exists():
+            raise
+        logger.warning(f"Cannot reach {url}; using the cached copy from {data_path}")
+        os.utime(data_path)
+        return data_path
+
+    try:
+        if response.status_code == 304 and data_path.exists():
+            logger.debug(f"Using cached copy of {url} from {data_path}")
+            os.utime(data_path)
+            return data_path
+
+        if response.status_code != 200:
+            raise ValueError(f"Remote file returned {response.status_code}: {response.text}")
+
+        logger.info(f"Downloading {url} to {data_path}")
+        _write_atomic(data_path, lambda fh: fh.writelines(response.iter_content(CHUNK_SIZE)))
+        metadata = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        _write_atomic(metadata_path, lambda fh: fh.write(json.dumps(metadata).encode("utf-8")))
+    finally:
+        response.close()
+
+    evict(cache_dir, max_size if max_size is not None else default_cache_size(), keep=data_path)
+    return data_path
+
+
+def evict(cache_dir: Path, max_size: int, keep: Path | None = None) -> None:
+    """
+    Remove the least recently used files from the cache until it is no larger than `max_size` bytes
+
+    :param cache_dir: The cache directory
+    :param max_size: The size in bytes to shrink the cache to
+    :param keep: A file that is never evicted, e.g. the one that was just downloaded
+    """
+    cached = [path for path in cache_dir.iterdir() if path.suffix == "" and not path.name.startswith(".")]
+    stats = {path: path.stat() for path in cached}
+    total = sum(stat.st_size for stat in stats.values())
+
+    for path in sorted(cached, key=lambda path: stats[path].st_mtime):
+        if total <= max_size:
+            break
+        if path == keep:
+            continue
+        logger.debug(f"Evicting {path} from the download cache")
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+        total -= stats[path].st_size
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from collections.abc import Generator, Iterable
+from itertools import islice
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+# Seconds the helper thread blocks on a full buffer before checking whether it should stop
+_POLL_INTERVAL = 0.1
+
+
+class _Done:
+    pass
+
+
+class _Failed:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class Prefetcher(Generic[T]):
+    """
+    Iterates over `iterable` on a helper thread, keeping up to `depth` batches of
+    `batch_size` items decoded ahead of the consumer
+
+    Reading and decompressing input (which releases the GIL for gzip and file I/O)
+    then overlaps with whatever the consumer does with each item. Exceptions raised
+    while iterating are re-raised in the consumer.
+
+    `stall_time` accumulates the seconds the consumer spent waiting on an empty
+    buffer: a large value means the input, not the transform, is the bottleneck.
+    """
+
+    def __init__(self, iterable: Iterable[T], depth: int, batch_size: int = 1000):
+        self.iterable = iterable
+        self.depth = depth
+        self.batch_size = batch_size
+        self.stall_time = 0.0
+
+        self._queue: queue.Queue[list[T] | _Done | _Failed] = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            iterator = iter(self.iterable)
+            while batch := list(islice(iterator, self.batch_size)):
+                if not self._put(batch):
+                    return
+            self._put(_Done())
+        except BaseException as e:
+            self._put(_Failed(e))
+
+    def __iter__(self) -> Generator[T, None, None]:
+        self._thread = threading.Thread(target=self._produce, name="koza-prefetch", daemon=True)
+        self._thread.start()
+
+        try:
+            while True:
+                try:
+                    batch = self._queue.get_nowait()
+                except queue.Empty:
+                    started = time.perf_counter()
+                    batch = self._queue.get()
+                    self.stall_time += time.perf_counter() - started
+
+                if isinstance(batch, _Done):
+                    return
+                if isinstance(batch, _Failed):
+                    raise batch.error
+
+                yield from batch
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the helper thread, e.g. when the consumer stops early"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
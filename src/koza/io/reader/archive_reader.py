@@ -0,0 +1,115 @@
+"""
+Parallel parsing of the members of a zip or tar archive
+"""
+
+from collections import deque
+from collections.abc import Generator, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any
+
+from loguru import logger
+
+from koza.io.reader.csv_reader import CSVReader
+from koza.io.reader.json_reader import JSONReader
+from koza.io.reader.jsonl_reader import JSONLReader
+from koza.io.utils import open_resource
+from koza.model.reader import CSVReaderConfig, JSONLReaderConfig, JSONReaderConfig, ReaderConfig, YAMLReaderConfig
+from koza.utils.row_filter import RowFilter
+
+
+def parse_member(archive_path: str, member: str, config: ReaderConfig) -> list[dict[str, Any]]:
+    """Parse and filter the rows of one archive member. Runs in a worker process."""
+    opened_resource = open_resource(archive_path)
+    if not isinstance(opened_resource, tuple):
+        raise ValueError(f"{archive_path} is not an archive")
+
+    archive, resources = opened_resource
+    try:
+        for resource in resources:
+            if resource.name != member:
+                continue
+
+            reader: Iterable[dict[str, Any]]
+            if isinstance(config, CSVReaderConfig):
+                reader = CSVReader(resource.reader, config)
+            elif isinstance(config, JSONLReaderConfig):
+                reader = JSONLReader(resource.reader, config)
+            elif isinstance(config, JSONReaderConfig | YAMLReaderConfig):
+                reader = JSONReader(resource.reader, config)
+            else:
+                raise ValueError(f"Reading archive members in parallel is not supported for {config.format} files")
+
+            if getattr(reader, "applies_filters", False):
+                return list(reader)
+            row_filter = RowFilter(config.filters)
+            return [row for row in reader if row_filter.include_row(row)]
+    finally:
+        archive.close()
+
+    raise ValueError(f"{member} is not in {archive_path}")
+
+
+class ArchiveReader:
+    """
+    A reader that parses the members of a zip or tar archive in parallel
+
+    Each member is opened, decompressed, parsed and filtered by one of `workers`
+    processes, each of which opens the archive itself. Rows are yielded in member
+    order if `preserve_order` is set, otherwise in the order that members finish.
+
+    Every member in flight is held in memory in full, and members of compressed tar
+    archives can only be reached by decompressing the archive up to them, so this
+    suits zip and uncompressed tar archives of many moderately sized files best.
+    """
+
+    #: Rows yielded by this reader have already been checked against `config.filters`
+    applies_filters = True
+
+    def __init__(
+        self,
+        archive_path: str,
+        members: list[str],
+        config: ReaderConfig,
+        workers: int,
+        preserve_order: bool = True,
+    ):
+        self.name = archive_path
+        self.archive_path = archive_path
+        self.members = members
+        self.config = config
+        self.workers = workers
+        self.preserve_order = preserve_order
+
+    def __iter__(self) -> Generator[dict[str, Any], None, None]:
+        members = iter(self.members)
+        executor = ProcessPoolExecutor(self.workers)
+        item_ct = 0
+
+        def submit(member: str) -> Future:
+            return executor.submit(parse_member, self.archive_path, member, self.config)
+
+        # Keep a bounded number of members in flight so memory use doesn't grow with the archive
+        pending: deque[Future] = deque(submit(member) for member in islice(members, self.workers))
+
+        try:
+            while pending:
+                if self.preserve_order:
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+
+                rows = future.result()
+
+                next_member = next(members, None)
+                if next_member is not None:
+                    pending.append(submit(next_member))
+
+                item_ct += len(rows)
+                yield from rows
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        logger.info(f"Finished processing {item_ct} rows from {len(self.members)} files in {self.archive_path}")
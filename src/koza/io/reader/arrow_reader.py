@@ -0,0 +1,116 @@
+from collections.abc import Generator
+from operator import ge, gt, le, lt
+from typing import Any
+
+from loguru import logger
+
+from koza.io.utils import SizedResource
+from koza.model.filters import ColumnFilter, FilterCode, FilterInclusion
+from koza.model.formats import InputFormat
+from koza.model.reader import ArrowReaderConfig, ParquetReaderConfig
+
+# The pyarrow.dataset format for each input format
+DATASET_FORMATS = {
+    InputFormat.parquet: "parquet",
+    InputFormat.arrow: "ipc",
+}
+
+COMPARISONS = {
+    FilterCode.lt: lt,
+    FilterCode.gt: gt,
+    FilterCode.lte: le,
+    FilterCode.ge: ge,
+}
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+    except ImportError as e:
+        raise ImportError(
+            "Reading parquet and arrow files requires the pyarrow package. Install it with `pip install koza[arrow]`."
+        ) from e
+    return pyarrow
+
+
+class ArrowReader:
+    """
+    A reader for Parquet and Arrow IPC files, which yields the rows of each record batch
+
+    Only the configured `columns` are decoded, and the reader's `filters` are pushed
+    down into the scan, so for Parquet, row groups whose statistics rule out every
+    row are skipped entirely. Values keep their types rather than being read as
+    strings. Only local (or downloaded) files that are not inside an archive can be
+    read this way.
+    """
+
+    #: Rows yielded by this reader have already been checked against `config.filters`
+    applies_filters = True
+
+    def __init__(self, resource: SizedResource, config: ParquetReaderConfig | ArrowReaderConfig):
+        if resource.path is None:
+            raise ValueError(f"Cannot read {resource.name} as {config.format}: files inside archives are not supported")
+
+        self.pa = _import_pyarrow()
+        self.io_str = resource.reader
+        self.name = resource.name
+        self.config = config
+        self.dataset = self.pa.dataset.dataset(resource.path, format=DATASET_FORMATS[config.format])
+
+    @property
+    def header(self) -> list[str]:
+        return self.config.columns or self.dataset.schema.names
+
+    def filter_expression(self):
+        """Build the pyarrow expression that a row must satisfy to pass all of the reader's filters"""
+        expression = None
+        for column_filter in self.config.filters:
+            condition = self._filter_expression(column_filter)
+            expression = condition if expression is None else expression & condition
+        return expression
+
+    def _filter_expression(self, column_filter: ColumnFilter):
+        pc = self.pa.compute
+        schema = self.dataset.schema
+
+        # A filter on a column that isn't in the file can never match, as in `RowFilter`
+        if column_filter.column not in schema.names:
+            return pc.scalar(False)
+
+        column = pc.field(column_filter.column)
+        if column_filter.filter_code in COMPARISONS:
+            match = COMPARISONS[column_filter.filter_code](column, column_filter.value)
+        elif column_filter.filter_code == FilterCode.eq:
+            match = column == column_filter.value
+        elif column_filter.filter_code == FilterCode.ne:
+            match = column != column_filter.value
+        else:
+            values = list(column_filter.value)
+            match = column.isin(values)
+            column_type = schema.field(column_filter.column).type
+            is_str = self.pa.types.is_string(column_type) or self.pa.types.is_large_string(column_type)
+            if column_filter.filter_code == FilterCode.inlist and is_str:
+                # `in` also matches values that contain any of the filter values
+                for value in values:
+                    if isinstance(value, str):
+                        match = match | pc.match_substring(column, value)
+
+        if column_filter.inclusion == FilterInclusion.exclude:
+            match = ~match
+        return column.is_valid() & match
+
+    def __iter__(self) -> Generator[dict[str, Any], None, None]:
+        batches = self.dataset.to_batches(
+            columns=self.config.columns,
+            filter=self.filter_expression(),
+            batch_size=self.config.batch_size,
+        )
+        item_ct = 0
+
+        for batch in batches:
+            item_ct += batch.num_rows
+            yield from batch.to_pylist()
+
+        logger.info(f"Finished processing {item_ct} rows for from file {self.name}")
@@ -1,10 +1,13 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from csv import reader
 from typing import IO, Any
 
 from loguru import logger
 
+from koza.io.row import Row
+from koza.io.utils import mmap_lines
 from koza.model.reader import CSVReaderConfig, FieldType, HeaderMode
+from koza.utils.row_filter import RowFilter
 
 FIELDTYPE_CLASS: dict[FieldType, Callable[[str], Any]] = {
     FieldType.str: str,
@@ -14,6 +17,46 @@ FIELDTYPE_CLASS: dict[FieldType, Callable[[str], Any]] = {
 }
 
 
+def make_row_decoder(
+    header: list[str],
+    converters: list[Callable[[str], Any]],
+    columns: list[str] | None = None,
+    compact: bool = False,
+) -> Callable[[list[str]], dict[str, Any] | Row]:
+    """
+    Generate a function that converts a list of fields into a row dict, for one header
+
+    The function builds the dict in a single expression, with each column's key and converter
+    fixed, rather than looking them up for every field. `str` columns are only stripped, and
+    `int` and `float` columns aren't, since those conversions already ignore surrounding whitespace.
+    If `columns` is given, only those columns are decoded into the dict, in that order.
+    If `compact` is set, rows are built as `Row`s sharing one index, instead of as dicts.
+    """
+    index = {column: i for i, column in enumerate(header)}
+    # As in a dict display, a repeated column keeps its first position and its last value
+    keys = list(dict.fromkeys(header if columns is None else columns))
+    namespace: dict[str, Any] = {"Row": Row, "row_index": {key: i for i, key in enumerate(keys)}}
+    values = []
+    for column in keys:
+        i = index[column]
+        convert = converters[i]
+        if convert is str:
+            values.append(f"row[{i}].strip()")
+        elif convert is int or convert is float:
+            values.append(f"{convert.__name__}(row[{i}])")
+        else:
+            namespace[f"convert_{i}"] = convert
+            values.append(f"convert_{i}(row[{i}].strip())")
+
+    if compact:
+        body = f"Row(row_index, ({''.join(f'{value}, ' for value in values)}))"
+    else:
+        # Header names only appear as repr()'d string literals, so they can't inject code
+        body = f"{{{', '.join(f'{key!r}: {value}' for key, value in zip(keys, values, strict=True))}}}"
+    exec(f"def decode_row(row):\n    return {body}\n", namespace)  # noqa: S102
+    return namespace["decode_row"]
+
+
 class CSVReader:
     """
     A CSV reader modelled after csv.DictReader
@@ -32,16 +75,30 @@ class CSVReader:
         can be mapped to types, and the CSVReader will attempt
         to coerce them from their str representation, eg int('42')
 
+      - Rows are checked against the config's filters on their raw
+        values, before the rest of the row is converted to a dict
+
+      - Only the config's `select_columns`, if set, are converted and
+        kept in each row
+
+      - With the config's `compact_rows` set, rows are yielded as
+        read-only `Row` mappings rather than dicts
+
       - Potentially will add support a multivalued field DSL, eg
         List[str][';'] would convert a semicolon delimited multivalued
         field to a list of strings
     """
 
+    #: Rows yielded by this reader have already been checked against `config.filters`
+    applies_filters = True
+
     def __init__(
         self,
         io_str: IO[str],
         config: CSVReaderConfig,
         *args: Any,
+        header: list[str] | None = None,
+        raw: IO[bytes] | None = None,
         **kwargs: Any,
     ):
         """
@@ -49,13 +106,25 @@ class CSVReader:
                        See https://docs.python.org/3/library/io.html#io.IOBase
         :param config: A configuration for the CSV reader. See model/config/source_config.py
         :param args: additional args to pass to csv.reader
+        :param header: An already parsed header. If given, `io_str` is read as data rows only,
+                       e.g. for a byte range from the middle of a file.
+        :param raw: The uncompressed local file beneath `io_str`. If given, lines are read from a
+                    memory map of it and decoded one at a time, instead of through `io_str`.
         :param kwargs: additional kwargs to pass to csv.reader
         """
         self.io_str = io_str
+        self.raw = raw
         self.config = config
         self.field_type_map = config.field_type_map
+        self.row_filter = RowFilter(config.filters)
 
         self._header = None
+        #: Number of physical lines read up to and including the header
+        self.header_line_count = 0
+
+        if header is not None:
+            self._ensure_field_type_map(header)
+            self._header = header
 
         delimiter = config.delimiter
 
@@ -68,11 +137,21 @@ class CSVReader:
         self.csv_kwargs["dialect"] = config.dialect
         self.csv_kwargs["delimiter"] = delimiter
 
-        self.reset()
+        # `io_str` isn't seeked here, so forward-only streams (e.g. members of a streamed tar) can be read
+        self.csv_reader = self._csv_reader()
+
+    def _csv_reader(self):
+        lines: Iterable[str] = self.io_str
+        if self.raw is not None:
+            encoding = getattr(self.io_str, "encoding", None) or "utf-8"
+            lines = (line.decode(encoding) for line in mmap_lines(self.raw))
+        # Kept so that a header with its own delimiter is read from the same lines as the data
+        self._lines = iter(lines)
+        return reader(self._lines, *self.csv_args, **self.csv_kwargs)
 
     def reset(self):
         self.io_str.seek(0)
-        self.csv_reader = reader(self.io_str, *self.csv_args, **self.csv_kwargs)
+        self.csv_reader = self._csv_reader()
 
     @property
     def header(self):
@@ -81,6 +160,7 @@ class CSVReader:
             self._ensure_field_type_map(header)
             self._compare_headers_to_supplied_columns(header)
             self._header = header
+            self.header_line_count += self.csv_reader.line_num
         return self._header
 
     def __iter__(self):
@@ -91,6 +171,25 @@ class CSVReader:
         if self.field_type_map is None:
             raise ValueError("Field type map not set on CSV source")
 
+        converters = [FIELDTYPE_CLASS.get(self.field_type_map.get(k) or FieldType.str, str) for k in header]
+
+        # Filters are checked against just their own (typed) columns of the raw row, so that the
+        # other columns are only converted, and the row dict only built, for rows that pass
+        index = {column: i for i, column in enumerate(header)}
+        missing_columns = [column for column in self.config.select_columns or [] if column not in index]
+        if missing_columns:
+            raise ValueError(f"Selected columns missing in source file {self.io_str.name}\n\t{missing_columns}")
+
+        row_filters = [
+            (index[column], converters[index[column]], predicate)
+            for column, predicate in self.row_filter.predicates
+            if column in index
+        ]
+        # A filter on a column that isn't in the file can never match, as in `RowFilter`
+        exclude_all = len(row_filters) < len(self.row_filter.predicates)
+        log_filtered = logger.opt(lazy=True).debug
+        decode_row = make_row_decoder(header, converters, self.config.select_columns, self.config.compact_rows)
+
         for row in self.csv_reader:
             if not row:
                 if self.config.skip_blank_lines:
@@ -101,35 +200,19 @@ class CSVReader:
             elif comment_char and row[0].startswith(comment_char):
                 continue
 
-            row = [val.strip() for val in row]
-            item = dict(zip(header, row, strict=False))
-
-            if len(item) > len(header):
-                num_extra_fields = len(item) - len(header)
-                logger.warning(
-                    f"CSV file {self.io_str.name} has {num_extra_fields} extra columns at {self.csv_reader.line_num}"
-                )
-
-            if len(header) > len(item):
-                num_missing_columns = len(header) - len(item)
+            if len(row) < len(header):
+                num_missing_columns = len(header) - len(row)
                 raise ValueError(
                     f"CSV file {self.io_str.name} is missing {num_missing_columns} "
                     f"column(s) at {self.csv_reader.line_num}"
                 )
 
-            typed_item: dict[str, Any] = {}
-
-            for k, v in item.items():
-                field_type = self.field_type_map.get(k, None)
-                if field_type is None:
-                    # FIXME: is this the right behavior? Or should we raise an error?
-                    # raise ValueError(f"No field type found for field {k}")
-                    field_type = FieldType.str
-
-                # By default, use `str` as a converter (essentially a noop)
-                converter = FIELDTYPE_CLASS.get(field_type, str)
+            if exclude_all or not all(predicate(convert(row[i].strip())) for i, convert, predicate in row_filters):
+                # Deferred formatting: only render the row if DEBUG is enabled.
+                log_filtered("Row filtered out: {}", lambda row=row: dict(zip(header, row, strict=False)))
+                continue
 
-                typed_item[k] = converter(v)
+            typed_item = decode_row(row)
 
             item_ct += 1
             yield typed_item
@@ -168,7 +251,7 @@ class CSVReader:
         # If the header delimiter is explicitly set create a new CSVReader using that one.
         if self.config.header_delimiter is not None:
             kwargs = self.csv_kwargs | {"delimiter": self.config.header_delimiter}
-            csv_reader = reader(self.io_str, *self.csv_args, **kwargs)
+            csv_reader = reader(self._lines, *self.csv_args, **kwargs)
 
         headers = next(csv_reader)
 
@@ -198,6 +281,9 @@ class CSVReader:
 
                 break
 
+        if csv_reader is not self.csv_reader:
+            self.header_line_count += csv_reader.line_num
+
         return [field.strip() for field in headers]
 
     def _ensure_field_type_map(self, header: list[str]):
@@ -0,0 +1,202 @@
+"""
+A CSV reader that parses with DuckDB's `read_csv`, for `engine: duckdb` in a CSV reader config
+"""
+
+from collections.abc import Generator
+from typing import Any
+
+import duckdb
+from loguru import logger
+
+from koza.io.reader.csv_reader import CSVReader
+from koza.io.row import Row
+from koza.io.utils import SizedResource
+from koza.model.filters import ColumnFilter, FilterCode, FilterInclusion
+from koza.model.reader import CSVReaderConfig, FieldType
+
+# Number of rows fetched from DuckDB at a time
+FETCH_SIZE = 10_000
+
+# The characters removed from the ends of every field, matching `str.strip()` for ASCII whitespace
+_WHITESPACE = " \t\n\r\x0b\x0c"
+
+FIELDTYPE_SQL: dict[FieldType, str] = {
+    FieldType.str: "VARCHAR",
+    FieldType.int: "BIGINT",
+    FieldType.float: "DOUBLE",
+}
+
+COMPARISON_SQL: dict[str, str] = {
+    FilterCode.lt: "<",
+    FilterCode.gt: ">",
+    FilterCode.lte: "<=",
+    FilterCode.ge: ">=",
+    FilterCode.eq: "=",
+    FilterCode.ne: "<>",
+}
+
+
+#: The DuckDB `compression` option for each compression that DuckDB can read
+DUCKDB_COMPRESSION = {
+    None: "none",
+    "gzip": "gzip",
+    "zstd": "zstd",
+}
+
+
+class DuckDBCSVReader:
+    """
+    A CSV reader that parses files with DuckDB rather than the `csv` module
+
+    The header is parsed exactly as `CSVReader` does it (so `header_mode`,
+    `header_prefix` and `header_delimiter` behave the same), and the data rows are
+    then parsed by DuckDB, in parallel and in large batches. Whitespace stripping,
+    `field_type_map` conversion, `comment_char` and the reader's `filters` are all
+    applied in the query, so filtered-out rows never become Python objects.
+
+    Unlike `CSVReader`, rows with missing trailing columns are padded with empty
+    values rather than raising an error. Only local files, optionally gzip or zstd
+    compressed, can be read this way.
+    """
+
+    #: Rows yielded by this reader have already been checked against `config.filters`
+    applies_filters = True
+
+    def __init__(self, resource: SizedResource, config: CSVReaderConfig):
+        if resource.path is None:
+            raise ValueError(f"Cannot read {resource.name} with DuckDB: only local files are supported")
+        if resource.compression not in DUCKDB_COMPRESSION:
+            raise ValueError(f"Cannot read {resource.name} with DuckDB: {resource.compression} is not supported")
+
+        self.io_str = resource.reader
+        self.path = resource.path
+        self.compression = DUCKDB_COMPRESSION[resource.compression]
+        self.config = config
+        self.field_type_map = config.field_type_map
+
+        self._header: list[str] | None = None
+        self.header_line_count = 0
+
+    @property
+    def header(self) -> list[str]:
+        if self._header is None:
+            csv_reader = CSVReader(self.io_str, self.config)
+            self._header = csv_reader.header
+            self.field_type_map = csv_reader.field_type_map
+            self.header_line_count = csv_reader.header_line_count
+        return self._header
+
+    @property
+    def columns(self) -> list[str]:
+        """The columns of each row: the config's `select_columns`, or else the whole header"""
+        header = self.header
+        if self.config.select_columns is None:
+            return header
+        missing_columns = [column for column in self.config.select_columns if column not in header]
+        if missing_columns:
+            raise ValueError(f"Selected columns missing in source file {self.io_str.name}\n\t{missing_columns}")
+        return self.config.select_columns
+
+    def query(self) -> tuple[str, list[Any]]:
+        """Build the SQL (and its parameters) that reads, types and filters the data rows"""
+        header = self.header
+        field_type_map = self.field_type_map or {}
+        raw_columns = [f"c{i}" for i in range(len(header))]
+
+        delimiter = " " if self.config.delimiter == "\\s" else self.config.delimiter
+        params: list[Any] = [
+            str(self.path),
+            delimiter,
+            self.header_line_count,
+            {column: "VARCHAR" for column in raw_columns},
+            self.compression,
+        ]
+
+        select: list[str] = []
+        for i, (raw_column, name) in enumerate(zip(raw_columns, header, strict=True)):
+            field_type = field_type_map.get(name, FieldType.str)
+            value = f"trim({raw_column}, '{_WHITESPACE}')"
+            if field_type == FieldType.str:
+                select.append(f"coalesce({value}, '') AS v{i}")
+            else:
+                select.append(f"CAST({value} AS {FIELDTYPE_SQL[field_type]}) AS v{i}")
+
+        conditions: list[str] = []
+        if self.config.comment_char:
+            conditions.append("NOT starts_with(coalesce(c0, ''), ?)")
+            params.append(self.config.comment_char)
+
+        # Only generated column names (c0, v0, ...) and SQL built here are interpolated into the
+        # query; every value from the config or the file is bound as a parameter
+        sql = (
+            f"SELECT {', '.join(select)} FROM read_csv("  # noqa: S608
+            "?, delim = ?, skip = ?, columns = ?, compression = ?, header = false, auto_detect = false, "
+            "quote = '\"', escape = '\"', null_padding = true, strict_mode = false)"
+        )
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+
+        filter_conditions: list[str] = []
+        for column_filter in self.config.filters:
+            condition, filter_params = self._filter_sql(column_filter, header, field_type_map)
+            filter_conditions.append(condition)
+            params.extend(filter_params)
+
+        # DuckDB pushes the outer projection down, so unselected columns are never converted
+        selected = ", ".join(f"v{header.index(column)}" for column in self.columns)
+        sql = f"SELECT {selected} FROM ({sql})"  # noqa: S608
+        if filter_conditions:
+            sql += f" WHERE {' AND '.join(filter_conditions)}"
+
+        return sql, params
+
+    @staticmethod
+    def _filter_sql(
+        column_filter: ColumnFilter,
+        header: list[str],
+        field_type_map: dict[str, FieldType],
+    ) -> tuple[str, list[Any]]:
+        # A filter on a column that isn't in the file can never match, as in `RowFilter`
+        if column_filter.column not in header:
+            return "false", []
+
+        column = f"v{header.index(column_filter.column)}"
+        is_str = field_type_map.get(column_filter.column, FieldType.str) == FieldType.str
+
+        params: list[Any]
+        if column_filter.filter_code in COMPARISON_SQL:
+            match = f"{column} {COMPARISON_SQL[column_filter.filter_code]} ?"
+            params = [column_filter.value]
+        else:
+            values = list(column_filter.value)
+            matches = [f"{column} IN ({', '.join('?' for _ in values)})"] if values else ["false"]
+            params = values
+            if column_filter.filter_code == FilterCode.inlist and is_str:
+                # `in` also matches values that contain any of the filter values
+                substrings = [value for value in values if isinstance(value, str)]
+                matches.extend(f"contains({column}, ?)" for _ in substrings)
+                params = [*values, *substrings]
+            match = " OR ".join(matches)
+
+        if column_filter.inclusion == FilterInclusion.exclude:
+            match = f"NOT ({match})"
+        return f"({column} IS NOT NULL AND {match})", params
+
+    def __iter__(self) -> Generator[dict[str, Any] | Row, None, None]:
+        columns = self.columns
+        sql, params = self.query()
+        item_ct = 0
+        # DuckDB already returns each row as a tuple, which a `Row` can hold as it is
+        row_index = {column: i for i, column in enumerate(columns)} if self.config.compact_rows else None
+
+        with duckdb.connect() as con:
+            result = con.execute(sql, params)
+            while rows := result.fetchmany(FETCH_SIZE):
+                for row in rows:
+                    item_ct += 1
+                    if row_index is not None:
+                        yield Row(row_index, row)
+                    else:
+                        yield dict(zip(columns, row, strict=True))
+
+        logger.info(f"Finished processing {item_ct} rows for from file {self.io_str.name}")
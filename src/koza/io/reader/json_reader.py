@@ -1,18 +1,246 @@
 import json
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from typing import IO, Any
 
 import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import (
+    DocumentEndEvent,
+    DocumentStartEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+    StreamStartEvent,
+)
+from yaml.resolver import Resolver
 
-from koza.io.utils import check_data
+from koza.io.utils import compile_check_data
 from koza.model.reader import JSONReaderConfig, YAMLReaderConfig
 
 # FIXME: Add back logging as part of progress
 
+# Number of characters read from the input at a time when streaming
+READ_CHUNK_SIZE = 1024 * 1024
+
+_WHITESPACE = " \t\n\r"
+# Characters that can continue a JSON number
+_NUMBER_CHARS = "0123456789+-.eE"
+
+try:
+    from yaml.cyaml import CParser, CSafeLoader
+
+    YAMLLoader: type = CSafeLoader
+
+    class YAMLEventLoader(CParser, Composer, SafeConstructor, Resolver):
+        """A safe loader that parses with libyaml but composes nodes in Python, one at a time"""
+
+        def __init__(self, stream):
+            CParser.__init__(self, stream)
+            Composer.__init__(self)
+            SafeConstructor.__init__(self)
+            Resolver.__init__(self)
+
+except ImportError:
+    YAMLLoader = yaml.SafeLoader
+    YAMLEventLoader = yaml.SafeLoader
+
+
+class JSONStream:
+    """
+    Incrementally walks a JSON document read from a text stream
+
+    Only the value currently being decoded (e.g. one element of an array) is held
+    in memory, along with at most a chunk of input that has already been consumed.
+    """
+
+    def __init__(self, io_str: IO[str], chunk_size: int = READ_CHUNK_SIZE):
+        self.io_str = io_str
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        """Read more input, returning False at the end of the stream"""
+        if self.eof:
+            return False
+        if self.pos > self.chunk_size:
+            # Drop input that has already been consumed
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        chunk = self.io_str.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at the end of the stream)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill(self.chunk_size):
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, *chars: str) -> str:
+        char = self.peek()
+        if char not in chars:
+            found = repr(char) if char else "end of input"
+            raise ValueError(f"Expected one of {', '.join(map(repr, chars))} in JSON document, found {found}")
+        self.pos += 1
+        return char
+
+    def decode(self) -> Any:
+        """Decode the next value"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value may continue beyond the buffer. Read progressively larger
+                # chunks so that decoding a large value doesn't take quadratic time.
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number is only complete once something other than part of a number follows it:
+            # it may have been cut at the end of the buffer, e.g. right after a "." or "e"
+            if (
+                isinstance(value, int | float)
+                and not isinstance(value, bool)
+                and (end == len(self.buffer) or self.buffer[end] in _NUMBER_CHARS)
+                and self._fill(size)
+            ):
+                continue
+            self.pos = end
+            return value
+
+    def walk(self, path: Iterable[str | int]):
+        """Move into the value at `path`, consuming the document up to it"""
+        for key in path:
+            if isinstance(key, int):
+                self.expect("[")
+                for _ in range(key):
+                    if self.peek() == "]":
+                        raise IndexError(f"JSON path index {key} is out of range")
+                    self.decode()
+                    if self.expect(",", "]") == "]":
+                        raise IndexError(f"JSON path index {key} is out of range")
+                if self.peek() == "]":
+                    raise IndexError(f"JSON path index {key} is out of range")
+                continue
+
+            self.expect("{")
+            if self.peek() == "}":
+                raise KeyError(key)
+            while True:
+                name = self.decode()
+                self.expect(":")
+                if name == key:
+                    break
+                self.decode()
+                if self.expect(",", "}") == "}":
+                    raise KeyError(key)
+
+    def items(self) -> Generator[Any, None, None]:
+        """Yield the elements of the array at the current position, or the value there if it isn't an array"""
+        if self.peek() != "[":
+            yield self.decode()
+            return
+
+        self.expect("[")
+        if self.peek() == "]":
+            return
+        while True:
+            yield self.decode()
+            if self.expect(",", "]") == "]":
+                return
+
+
+class YAMLStream:
+    """
+    Incrementally walks a (possibly multi-document) YAML stream
+
+    Each document is walked to a path, and then the elements of the sequence there
+    are composed and constructed one at a time.
+    """
+
+    def __init__(self, io_str: IO[str]):
+        self.loader = YAMLEventLoader(io_str)
+
+    def _expect(self, event_class: type, key: str | int):
+        if not self.loader.check_event(event_class):
+            event = self.loader.peek_event()
+            raise ValueError(f"Cannot follow YAML path at {key!r}: found {type(event).__name__}")
+        self.loader.get_event()
+
+    def _skip_node(self):
+        self.loader.compose_node(None, None)
+
+    def _walk(self, path: Iterable[str | int]):
+        loader = self.loader
+        for key in path:
+            if isinstance(key, int):
+                self._expect(SequenceStartEvent, key)
+                for _ in range(key):
+                    if loader.check_event(SequenceEndEvent):
+                        raise IndexError(f"YAML path index {key} is out of range")
+                    self._skip_node()
+                if loader.check_event(SequenceEndEvent):
+                    raise IndexError(f"YAML path index {key} is out of range")
+                continue
+
+            self._expect(MappingStartEvent, key)
+            while True:
+                if loader.check_event(MappingEndEvent):
+                    raise KeyError(key)
+                name = loader.construct_document(loader.compose_node(None, None))
+                if name == key:
+                    break
+                self._skip_node()
+
+    def items(self, path: Iterable[str | int]) -> Generator[Any, None, None]:
+        """
+        For every document, yield the elements of the sequence at `path`, or the
+        value there if it isn't a sequence
+        """
+        loader = self.loader
+        try:
+            self._expect(StreamStartEvent, "")
+            while loader.check_event(DocumentStartEvent):
+                loader.get_event()
+                self._walk(path)
+
+                if loader.check_event(SequenceStartEvent):
+                    loader.get_event()
+                    while not loader.check_event(SequenceEndEvent):
+                        yield loader.construct_document(loader.compose_node(None, None))
+                else:
+                    yield loader.construct_document(loader.compose_node(None, None))
+
+                # Skip the rest of the document
+                while not loader.check_event(DocumentEndEvent):
+                    loader.get_event()
+                loader.get_event()
+                loader.anchors = {}
+        finally:
+            loader.dispose()
+
 
 class JSONReader:
     """
     A JSON reader that optionally iterates over a json list
+
+    With `streaming` set in the reader configuration, the document is parsed
+    incrementally instead of being loaded up front: the reader walks to
+    `json_path` and yields the elements of the array there one at a time. For
+    YAML, every document of a multi-document (`---` separated) stream is read
+    this way.
     """
 
     def __init__(
@@ -27,9 +255,14 @@ class JSONReader:
         """
         self.io_str = io_str
         self.config = config
+        self.streaming = config.streaming
+        self._required_checks = [(prop, compile_check_data(prop)) for prop in config.required_properties or []]
+
+        if self.streaming:
+            return
 
         if isinstance(config, YAMLReaderConfig):
-            json_obj = yaml.safe_load(self.io_str)
+            json_obj = yaml.load(self.io_str, Loader=YAMLLoader)  # noqa: S506
         else:
             json_obj = json.load(self.io_str)
 
@@ -42,13 +275,24 @@ class JSONReader:
         else:
             self.json_obj = [json_obj]
 
+    def _stream_items(self) -> Generator[Any, None, None]:
+        if isinstance(self.config, YAMLReaderConfig):
+            yield from YAMLStream(self.io_str).items(self.config.json_path or [])
+            return
+
+        stream = JSONStream(self.io_str)
+        stream.walk(self.config.json_path or [])
+        yield from stream.items()
+
     def __iter__(self) -> Generator[dict[str, Any], None, None]:
-        for item in self.json_obj:
+        items = self._stream_items() if self.streaming else self.json_obj
+
+        for item in items:
             if not isinstance(item, dict):
                 raise ValueError()
 
-            if self.config.required_properties:
-                missing_properties = [prop for prop in self.config.required_properties if not check_data(item, prop)]
+            if self._required_checks:
+                missing_properties = [prop for prop, check in self._required_checks if not check(item)]
 
                 if missing_properties:
                     raise ValueError(
@@ -1,37 +1,78 @@
+import codecs
 import json
-from typing import IO
+from collections.abc import Generator, Iterable
+from typing import IO, Any
 
-from koza.io.utils import check_data
+import orjson
+
+from koza.io.utils import compile_check_data, mmap_lines
 from koza.model.reader import JSONLReaderConfig
 
 # FIXME: Add back logging as part of progress
 
+# Approximate number of bytes of lines read from the input at a time
+READ_BATCH_SIZE = 1024 * 1024
+
 
 class JSONLReader:
     """
     A simple JSON lines reader that optionally returns a subset of
     configured properties
+
+    Lines are decoded with orjson. Where the input is a UTF-8 text stream over a
+    binary one, lines are read from the binary stream in large batches, skipping
+    the text decoding step. Given the `raw` file beneath the stream, lines are
+    read from a memory map of it instead.
     """
 
     def __init__(
         self,
         io_str: IO[str],
         config: JSONLReaderConfig,
+        raw: IO[bytes] | None = None,
     ):
         """
         :param io_str: Any IO stream that yields a string
                        See https://docs.python.org/3/library/io.html#io.IOBase
         :param config: The JSONL reader configuration
-        :param row_limit: The number of lines to be read. No limit if 0.
+        :param raw: The uncompressed local file beneath `io_str`, to memory map
         """
         self.io_str = io_str
         self.config = config
+        self.raw = raw
+        self._required_checks = [(prop, compile_check_data(prop)) for prop in config.required_properties or []]
+        self._selected = config.select_properties
+
+    def _lines(self) -> Iterable[bytes | str]:
+        buffer = getattr(self.io_str, "buffer", None)
+        encoding = getattr(self.io_str, "encoding", None)
+        if encoding is not None and codecs.lookup(encoding).name == "utf-8":
+            if self.raw is not None:
+                yield from mmap_lines(self.raw)
+                return
+            if buffer is not None:
+                while lines := buffer.readlines(READ_BATCH_SIZE):
+                    yield from lines
+                return
+
+        yield from self.io_str
 
-    def __iter__(self):
-        for line in self.io_str:
-            item = json.loads(line)
-            if self.config.required_properties:
-                missing_properties = [prop for prop in self.config.required_properties if not check_data(item, prop)]
+    def __iter__(self) -> Generator[dict[str, Any], None, None]:
+        required_checks = self._required_checks
+        selected = self._selected
+
+        for line in self._lines():
+            if not line.strip():
+                continue
+
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                # orjson is stricter than the json module, e.g. about NaN and very large integers
+                item = json.loads(line)
+
+            if required_checks:
+                missing_properties = [prop for prop, check in required_checks if not check(item)]
 
                 if missing_properties:
                     raise ValueError(
@@ -40,4 +81,7 @@ class JSONLReader:
                         f"Row: {item}"
                     )
 
+            if selected is not None:
+                item = {key: item[key] for key in selected if key in item}
+
             yield item
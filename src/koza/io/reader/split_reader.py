@@ -0,0 +1,148 @@
+"""
+Parallel parsing of a single uncompressed CSV or JSONL file, split into newline-aligned byte ranges
+"""
+
+import io
+from collections import deque
+from collections.abc import Generator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import IO, Any
+
+from koza.io.reader.csv_reader import CSVReader
+from koza.io.reader.jsonl_reader import JSONLReader
+from koza.io.utils import SizedResource
+from koza.model.reader import CSVReaderConfig, JSONLReaderConfig
+from koza.utils.row_filter import RowFilter
+
+
+def byte_ranges(raw: IO[bytes], start: int, size: int, split_size: int) -> list[tuple[int, int]]:
+    """
+    Split bytes `start` to `size` of a seekable binary file into consecutive
+    `(start, end)` ranges of roughly `split_size` bytes, each ending on a newline.
+    """
+    ranges: list[tuple[int, int]] = []
+    while start < size:
+        end = start + split_size
+        if end >= size:
+            end = size
+        else:
+            # Move the boundary forward to just past the next newline (which may be at `end - 1` itself)
+            raw.seek(end - 1)
+            raw.readline()
+            end = raw.tell()
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def parse_range(
+    path: str,
+    start: int,
+    end: int,
+    config: CSVReaderConfig | JSONLReaderConfig,
+    header: list[str] | None,
+    encoding: str,
+) -> list[dict[str, Any]]:
+    """Parse and filter the rows in one byte range of a file. Runs in a worker process."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+
+    io_str = io.StringIO(data.decode(encoding))
+    io_str.name = f"{path}[{start}:{end}]"
+
+    reader: CSVReader | JSONLReader
+    if isinstance(config, CSVReaderConfig):
+        reader = CSVReader(io_str, config, header=header)
+    else:
+        reader = JSONLReader(io_str, config)
+
+    if getattr(reader, "applies_filters", False):
+        return list(reader)
+    row_filter = RowFilter(config.filters)
+    return [row for row in reader if row_filter.include_row(row)]
+
+
+class SplitReader:
+    """
+    A reader that parses one large uncompressed CSV or JSONL file in parallel
+
+    The file is split into newline-aligned byte ranges of about `split_size` bytes,
+    each of which is parsed (and filtered) by one of `workers` processes. For CSV
+    files, the header is parsed once, here, and handed to every worker. Rows are
+    yielded in file order if `preserve_order` is set, otherwise in the order that
+    ranges finish.
+
+    Rows containing quoted newlines are not supported, since a range boundary may
+    fall inside one.
+    """
+
+    #: Rows yielded by this reader have already been checked against `config.filters`
+    applies_filters = True
+
+    def __init__(
+        self,
+        resource: SizedResource,
+        config: CSVReaderConfig | JSONLReaderConfig,
+        workers: int,
+        split_size: int,
+        preserve_order: bool = True,
+    ):
+        if resource.raw is None:
+            raise ValueError(f"Cannot split {resource.name}: only uncompressed local files can be split")
+
+        self.io_str = resource.reader
+        self.raw = resource.raw
+        self.size = resource.size
+        self.config = config
+        self.workers = workers
+        self.split_size = split_size
+        self.preserve_order = preserve_order
+
+    def _data_start(self) -> tuple[list[str] | None, int]:
+        """Parse the CSV header (if any) and return it with the byte offset of the first data row"""
+        if not isinstance(self.config, CSVReaderConfig):
+            return None, 0
+
+        csv_reader = CSVReader(self.io_str, self.config)
+        header = csv_reader.header
+
+        self.raw.seek(0)
+        for _ in range(csv_reader.header_line_count):
+            self.raw.readline()
+
+        return header, self.raw.tell()
+
+    def __iter__(self) -> Generator[dict[str, Any], None, None]:
+        header, start = self._data_start()
+        ranges = iter(byte_ranges(self.raw, start, self.size, self.split_size))
+        path = str(self.raw.name)
+        encoding = getattr(self.io_str, "encoding", None) or "utf-8"
+
+        executor = ProcessPoolExecutor(self.workers)
+
+        def submit(byte_range: tuple[int, int]) -> Future:
+            return executor.submit(parse_range, path, *byte_range, self.config, header, encoding)
+
+        # Keep a bounded number of ranges in flight so memory use doesn't grow with the file
+        pending: deque[Future] = deque(submit(byte_range) for byte_range in islice(ranges, self.workers * 2))
+
+        try:
+            while pending:
+                if self.preserve_order:
+                    future = pending.popleft()
+                else:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    future = done.pop()
+                    pending.remove(future)
+
+                rows = future.result()
+
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    pending.append(submit(next_range))
+
+                yield from rows
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,44 @@
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+
+class Row(Mapping[str, Any]):
+    """
+    A read-only row, with its values stored in a tuple
+
+    All the rows of a file share one `index` mapping column names to positions in
+    `values`, so unlike dicts, rows don't each hold their own copy of the keys. This
+    makes buffering many rows (e.g. in `prepare_data`) much cheaper in memory.
+
+    Rows can be read like dicts (`row["col"]`, `row.get("col")`, `dict(row)`), and
+    compare equal to dicts with the same items, but can't be modified.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: dict[str, int], values: tuple[Any, ...]):
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._index.get(key)
+        return default if i is None else self._values[i]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"Row({dict(self)!r})"
+
+    def __reduce__(self):
+        # Rows pickled together (e.g. a batch sent to a worker) still share one index
+        return Row, (self._index, self._values)
@@ -0,0 +1,120 @@
+import queue
+import threading
+from collections.abc import Iterable
+from itertools import islice
+from typing import Any
+
+from koza.io.writer.writer import KozaWriter
+
+# Number of entities handed to the writer thread at a time
+_BATCH_SIZE = 1000
+_STOP = object()
+
+
+class AsyncWriter(KozaWriter):
+    """
+    Wraps another writer so that entities are serialized and written on a background thread
+
+    Entities are passed to the thread in batches through a queue holding at most
+    `queue_size` batches, so a transform that produces entities faster than they can
+    be written blocks instead of buffering without limit. An exception raised by the
+    wrapped writer is re-raised in the calling thread on the next write, or at the
+    latest by `finalize()`.
+
+    Node and edge counts are those of the wrapped writer, so they are only complete
+    once `finalize()` has returned.
+    """
+
+    def __init__(self, writer: KozaWriter, queue_size: int = 64):
+        self.writer = writer
+        self.config = writer.config
+        self.queue_size = queue_size
+
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=queue_size)
+        self._pending: list[Any] = []
+        self._error: BaseException | None = None
+        self._finalized = False
+        self._thread = threading.Thread(target=self._run, name="koza-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def node_count(self) -> int:  # type: ignore[override]
+        return self.writer.node_count
+
+    @property
+    def edge_count(self) -> int:  # type: ignore[override]
+        return self.writer.edge_count
+
+    def _run(self):
+        while (task := self._queue.get()) is not _STOP:
+            # After a failure, keep draining the queue so that producers never block on it
+            if self._error is not None:
+                continue
+            method, args = task
+            try:
+                getattr(self.writer, method)(*args)
+            except BaseException as e:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self, method: str, *args: Any):
+        self._raise_error()
+        if self._finalized:
+            raise ValueError("Cannot write to a writer that has been finalized")
+        self._queue.put((method, args))
+
+    def _flush_pending(self):
+        if self._pending:
+            entities, self._pending = self._pending, []
+            self._submit("write", entities)
+
+    def _submit_batches(self, method: str, entities: Iterable):
+        iterator = iter(entities)
+        while batch := list(islice(iterator, _BATCH_SIZE)):
+            self._submit(method, batch)
+
+    def write(self, entities: Iterable):
+        # Coalesce the small writes made by `koza.write()` into full batches
+        for entity in entities:
+            self._pending.append(entity)
+            if len(self._pending) >= _BATCH_SIZE:
+                self._flush_pending()
+
+    def write_nodes(self, nodes: Iterable):
+        self._flush_pending()
+        self._submit_batches("write_nodes", nodes)
+
+    def write_edges(self, edges: Iterable):
+        self._flush_pending()
+        self._submit_batches("write_edges", edges)
+
+    def finalize(self):
+        if not self._finalized:
+            self._flush_pending()
+            self._finalized = True
+            self._queue.put(_STOP)
+            self._thread.join()
+            try:
+                self.writer.finalize()
+            finally:
+                self._raise_error()
+
+    def validate_counts(self) -> None:
+        self.writer.validate_counts()
+
+    def output_files(self) -> list[str]:
+        return self.writer.output_files()
+
+    def with_shard(self, shard: str) -> "AsyncWriter":
+        return AsyncWriter(self.writer.with_shard(shard), queue_size=self.queue_size)
+
+    def merge_shard(self, shard: str) -> None:
+        # Goes through the queue so the shard lands after everything written so far
+        self._flush_pending()
+        self._submit("merge_shard", shard)
+
+    def result(self):
+        return self.writer.result()
@@ -19,9 +19,11 @@ class JSONLWriter(KozaWriter):
         output_dir: str,
         source_name: str,
         config: WriterConfig,
+        shard: str | None = None,
     ):
         self.output_dir = output_dir
         self.source_name = source_name
+        self.shard = shard
         self.config = config
         self.sssom_config = config.sssom_config
 
@@ -34,11 +36,15 @@ class JSONLWriter(KozaWriter):
 
     def _ensure_node_file_handle(self):
         if not hasattr(self, "nodeFH"):
-            self.nodeFH = open(f"{self.output_dir}/{self.source_name}_nodes.jsonl", "wb")
+            self.nodeFH = open(self._file_name("nodes", self.shard), "wb")
 
     def _ensure_edge_file_handle(self):
         if not hasattr(self, "edgeFH"):
-            self.edgeFH = open(f"{self.output_dir}/{self.source_name}_edges.jsonl", "wb")
+            self.edgeFH = open(self._file_name("edges", self.shard), "wb")
+
+    def _file_name(self, kind: str, shard: str | None) -> str:
+        suffix = f".{shard}" if shard else ""
+        return f"{self.output_dir}/{self.source_name}_{kind}{suffix}.jsonl"
 
     @staticmethod
     def _serialize(entity) -> bytes:
@@ -114,3 +120,44 @@ class JSONLWriter(KozaWriter):
                 self.edgeFH.write(b"".join(self._edge_buf))
                 self._edge_buf.clear()
             self.edgeFH.close()
+
+    def output_files(self) -> list[str]:
+        return [str(fh.name) for fh in (getattr(self, "nodeFH", None), getattr(self, "edgeFH", None)) if fh]
+
+    def with_shard(self, shard: str) -> "JSONLWriter":
+        if self.shard:
+            shard = f"{self.shard}.{shard}"
+        return JSONLWriter(self.output_dir, self.source_name, self.config, shard=shard)
+
+    def merge_shard(self, shard: str) -> None:
+        if self.shard:
+            shard = f"{self.shard}.{shard}"
+
+        node_file = self._file_name("nodes", shard)
+        if os.path.exists(node_file):
+            self._ensure_node_file_handle()
+            with open(node_file, "rb") as fh:
+                for line in fh:
+                    # Nodes are only de-duplicated within a shard, so check them against this writer's ids again
+                    node_id = orjson.loads(line)["id"]
+                    if node_id in self.written_node_ids:
+                        continue
+                    self._node_buf.append(line)
+                    self.written_node_ids.add(node_id)
+                    self.node_count += 1
+                    if len(self._node_buf) >= _WRITE_BATCH:
+                        self.nodeFH.write(b"".join(self._node_buf))
+                        self._node_buf.clear()
+            os.remove(node_file)
+
+        edge_file = self._file_name("edges", shard)
+        if os.path.exists(edge_file):
+            self._ensure_edge_file_handle()
+            with open(edge_file, "rb") as fh:
+                for line in fh:
+                    self._edge_buf.append(line)
+                    self.edge_count += 1
+                    if len(self._edge_buf) >= _WRITE_BATCH:
+                        self.edgeFH.write(b"".join(self._edge_buf))
+                        self._edge_buf.clear()
+            os.remove(edge_file)
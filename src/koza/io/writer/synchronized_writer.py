@@ -0,0 +1,66 @@
+import threading
+from collections.abc import Iterable
+from itertools import islice
+
+from koza.io.writer.writer import KozaWriter
+
+# Number of entities written per lock acquisition
+_BATCH_SIZE = 1000
+
+
+class SynchronizedWriter(KozaWriter):
+    """
+    Wraps another writer so that it can be shared between threads
+
+    Each call to the wrapped writer is made while holding a lock. Iterables of
+    entities (which may be generators running transform code) are consumed outside
+    of the lock and written in batches, so threads only contend on actual writes.
+    """
+
+    def __init__(self, writer: KozaWriter):
+        self.writer = writer
+        self.config = writer.config
+        self._lock = threading.Lock()
+
+    @property
+    def node_count(self) -> int:  # type: ignore[override]
+        return self.writer.node_count
+
+    @property
+    def edge_count(self) -> int:  # type: ignore[override]
+        return self.writer.edge_count
+
+    def _write_batches(self, method: str, entities: Iterable):
+        iterator = iter(entities)
+        while batch := list(islice(iterator, _BATCH_SIZE)):
+            with self._lock:
+                getattr(self.writer, method)(batch)
+
+    def write(self, entities: Iterable):
+        self._write_batches("write", entities)
+
+    def write_nodes(self, nodes: Iterable):
+        self._write_batches("write_nodes", nodes)
+
+    def write_edges(self, edges: Iterable):
+        self._write_batches("write_edges", edges)
+
+    def finalize(self):
+        with self._lock:
+            self.writer.finalize()
+
+    def validate_counts(self) -> None:
+        self.writer.validate_counts()
+
+    def output_files(self) -> list[str]:
+        return self.writer.output_files()
+
+    def with_shard(self, shard: str) -> KozaWriter:
+        return self.writer.with_shard(shard)
+
+    def merge_shard(self, shard: str) -> None:
+        with self._lock:
+            self.writer.merge_shard(shard)
+
+    def result(self):
+        return self.writer.result()
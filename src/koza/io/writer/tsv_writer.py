@@ -19,8 +19,10 @@ class TSVWriter(KozaWriter):
         output_dir: str | Path,
         source_name: str,
         config: WriterConfig,
+        shard: str | None = None,
     ):
         self.basename = source_name
+        self.shard = shard
         self.dirname = output_dir
         self.delimiter = "\t"
         self.list_delimiter = "|"
@@ -30,12 +32,13 @@ class TSVWriter(KozaWriter):
 
         Path(self.dirname).mkdir(parents=True, exist_ok=True)
 
-        node_properties = config.node_properties
-        edge_properties = config.edge_properties
+        # Copy the configured properties, since ordering the columns consumes the list it is given
+        node_properties = list(config.node_properties or [])
+        edge_properties = list(config.edge_properties or [])
 
         if node_properties:  # Make node file
             self.node_columns = TSVWriter._order_columns(node_properties, "node")
-            self.nodes_file_name = Path(self.dirname if self.dirname else "", f"{self.basename}_nodes.tsv")
+            self.nodes_file_name = self._file_name("nodes", shard)
             self.nodeFH = open(self.nodes_file_name, "w")
             self.nodeFH.write(self.delimiter.join(self.node_columns) + "\n")
 
@@ -43,7 +46,7 @@ class TSVWriter(KozaWriter):
             if config.sssom_config:
                 edge_properties = self.add_sssom_columns(edge_properties)
             self.edge_columns = TSVWriter._order_columns(edge_properties, "edge")
-            self.edges_file_name = Path(self.dirname if self.dirname else "", f"{self.basename}_edges.tsv")
+            self.edges_file_name = self._file_name("edges", shard)
             self.edgeFH = open(self.edges_file_name, "w")
             self.edgeFH.write(self.delimiter.join(self.edge_columns) + "\n")
 
@@ -100,6 +103,44 @@ class TSVWriter(KozaWriter):
         if hasattr(self, "edgeFH"):
             self.edgeFH.close()
 
+    def output_files(self) -> list[str]:
+        return [str(fh.name) for fh in (getattr(self, "nodeFH", None), getattr(self, "edgeFH", None)) if fh]
+
+    def with_shard(self, shard: str) -> "TSVWriter":
+        if self.shard:
+            shard = f"{self.shard}.{shard}"
+        return TSVWriter(self.dirname, self.basename, self.config, shard=shard)
+
+    def merge_shard(self, shard: str) -> None:
+        if self.shard:
+            shard = f"{self.shard}.{shard}"
+
+        if hasattr(self, "nodeFH"):
+            self.node_count += self._append_file(self._file_name("nodes", shard), self.nodeFH)
+        if hasattr(self, "edgeFH"):
+            self.edge_count += self._append_file(self._file_name("edges", shard), self.edgeFH)
+
+    def _file_name(self, kind: Literal["nodes", "edges"], shard: str | None) -> Path:
+        suffix = f".{shard}" if shard else ""
+        return Path(self.dirname if self.dirname else "", f"{self.basename}_{kind}{suffix}.tsv")
+
+    @staticmethod
+    def _append_file(file_name: Path, fh) -> int:
+        """Copy the rows of a shard file (minus its header) into `fh` and delete it.
+
+        Returns the number of rows copied.
+        """
+        if not file_name.exists():
+            return 0
+        rows = 0
+        with open(file_name) as shard_fh:
+            next(shard_fh, None)  # header
+            for line in shard_fh:
+                fh.write(line)
+                rows += 1
+        file_name.unlink()
+        return rows
+
     @staticmethod
     def _order_columns(cols: list[str], record_type: Literal["node", "edge"]) -> OrderedSet[str]:
         """Arrange node or edge columns in a defined order.
@@ -79,5 +79,24 @@ class KozaWriter(ABC):
         if violations:
             raise CountValidationError("; ".join(violations))
 
+    def output_files(self) -> list[str]:
+        """Paths of the files this writer has created."""
+        return []
+
+    def with_shard(self, shard: str) -> "KozaWriter":
+        """Return a new writer of the same kind whose output files carry a `.{shard}` suffix.
+
+        Used by multi-process runs, where every worker writes its own shard that
+        is later folded back into this writer with `merge_shard`.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support sharded output")
+
+    def merge_shard(self, shard: str) -> None:
+        """Append the finalized output of the `shard` writer to this writer, then remove it.
+
+        Node and edge tallies are updated for every row that is carried over.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support sharded output")
+
     def result(self):
         raise NotImplementedError()
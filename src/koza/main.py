@@ -10,6 +10,7 @@ import typer
 from loguru import logger
 from tqdm import tqdm
 
+from koza.batch import expand_config_patterns, format_summary, run_ingests, write_summary
 from koza.graph_operations import (
     append_graphs,
     compute_information_content,
@@ -64,10 +65,18 @@ from koza.model.graph_operations import (
     TabularReportFormat,
 )
 from koza.model.koza import KozaConfig
-from koza.model.reader import CSVReaderConfig, JSONLReaderConfig, JSONReaderConfig, YAMLReaderConfig
+from koza.model.reader import (
+    ArrowReaderConfig,
+    CSVReaderConfig,
+    JSONLReaderConfig,
+    JSONReaderConfig,
+    ParquetReaderConfig,
+    YAMLReaderConfig,
+)
 from koza.model.transform import TransformConfig
 from koza.model.writer import WriterConfig
 from koza.runner import KozaRunner
+from koza.utils.shard import Shard
 
 typer_app = typer.Typer(
     no_args_is_help=True,
@@ -122,6 +131,9 @@ def _infer_input_format(files: list[str]) -> InputFormat:
         ".jsonl": InputFormat.jsonl,
         ".tsv": InputFormat.csv,
         ".csv": InputFormat.csv,
+        ".parquet": InputFormat.parquet,
+        ".arrow": InputFormat.arrow,
+        ".feather": InputFormat.arrow,
     }
 
     if not files:
@@ -182,6 +194,29 @@ def transform(
         bool,
         typer.Option("--progress", "-p", help="Display progress of transform"),
     ] = False,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            min=1,
+            help="Number of worker processes to run `@koza.transform_record` functions in",
+        ),
+    ] = 1,
+    tag_workers: Annotated[
+        int,
+        typer.Option(
+            "--tag-workers",
+            min=1,
+            help="Number of threads to run the transforms for different readers (tags) in",
+        ),
+    ] = 1,
+    shard: Annotated[
+        str | None,
+        typer.Option(
+            "--shard",
+            help="Only process shard i of n (`i/n`), by input file or by the reader's `shard_key` column",
+        ),
+    ] = None,
     quiet: Annotated[
         bool,
         typer.Option("--quiet", "-q", help="Disable log output"),
@@ -221,9 +256,26 @@ def transform(
 
         # TSV with explicit delimiter
         koza transform transform.py -d '\\t' data/*.txt
+
+        # Spread `@koza.transform_record` functions over 8 processes
+        koza transform config.yaml --workers 8
+
+        # Run the transforms for each of a config's readers at the same time
+        koza transform config.yaml --tag-workers 4
+
+        # Process the second of four shards of the input (e.g. on a second machine)
+        koza transform config.yaml --shard 1/4
     """
     logger.remove()
 
+    try:
+        selected_shard = Shard.parse(shard) if shard else None
+    except ValueError as e:
+        raise typer.BadParameter(str(e), param_hint="--shard") from e
+
+    if workers > 1 and tag_workers > 1:
+        raise typer.BadParameter("Cannot be combined with --workers", param_hint="--tag-workers")
+
     output_path = Path(output_dir)
 
     if output_path.exists() and not output_path.is_dir():
@@ -265,6 +317,8 @@ def transform(
                 InputFormat.yaml: YAMLReaderConfig,
                 InputFormat.json: JSONReaderConfig,
                 InputFormat.jsonl: JSONLReaderConfig,
+                InputFormat.parquet: ParquetReaderConfig,
+                InputFormat.arrow: ArrowReaderConfig,
             }
             reader_config = reader_configs[detected_format](files=input_files)
 
@@ -289,6 +343,9 @@ def transform(
             output_dir=output_dir,
             row_limit=row_limit,
             show_progress=show_progress,
+            workers=workers,
+            shard=selected_shard,
+            tag_workers=tag_workers,
         )
     else:
         # Existing behavior: load from config file
@@ -301,6 +358,9 @@ def transform(
             output_format=output_format,
             row_limit=row_limit,
             show_progress=show_progress,
+            workers=workers,
+            shard=selected_shard,
+            tag_workers=tag_workers,
         )
 
     logger.info(f"Running transform for {config.name} with output to `{output_dir}`")
@@ -310,6 +370,74 @@ def transform(
     logger.info(f"Finished transform for {config.name}")
 
 
+@typer_app.command(name="transform-all")
+def transform_all(
+    configs: Annotated[
+        list[str],
+        typer.Argument(help="Configuration YAML files or glob patterns (quote globs to let koza expand them)"),
+    ],
+    output_dir: Annotated[
+        str,
+        typer.Option("--output-dir", "-o", help="Path to output directory"),
+    ] = "./output",
+    output_format: Annotated[
+        OutputFormat | None,
+        typer.Option("--output-format", "-f", help="Output format (overrides each config's writer format)"),
+    ] = None,
+    row_limit: Annotated[
+        int,
+        typer.Option("--limit", "-n", help="Number of rows to process per ingest (if skipped, processes everything)"),
+    ] = 0,
+    concurrency: Annotated[
+        int | None,
+        typer.Option("--concurrency", "-j", min=1, help="Number of ingests to run at once (default: number of CPUs)"),
+    ] = None,
+    summary: Annotated[
+        Path | None,
+        typer.Option("--summary", help="Write a JSON summary of every ingest to this file"),
+    ] = None,
+    quiet: Annotated[
+        bool,
+        typer.Option("--quiet", "-q", help="Disable log output from the ingests"),
+    ] = False,
+    verbose: Annotated[
+        bool,
+        typer.Option("--verbose", "-v", help="Enable debug-level logging"),
+    ] = False,
+) -> None:
+    """Run many ingest configs in a pool of processes and summarize the results.
+
+    Each ingest runs in its own process, forked from a server that has already
+    imported koza, so the configs don't each pay interpreter startup and import
+    costs. Exits with status 1 if any ingest failed.
+
+    Examples:
+        # Run every ingest config under ingests/, four at a time
+        koza transform-all 'ingests/*.yaml' -j 4 -o ./output
+
+        # Also write a machine-readable summary
+        koza transform-all a.yaml b.yaml --summary output/summary.json
+    """
+    config_files = expand_config_patterns(configs)
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    results = run_ingests(
+        config_files,
+        output_dir=output_dir,
+        output_format=output_format,
+        row_limit=row_limit,
+        concurrency=concurrency,
+        log_level=None if quiet else ("DEBUG" if verbose else "INFO"),
+    )
+
+    typer.echo(format_summary(results))
+    if summary is not None:
+        write_summary(results, summary)
+
+    if any(not result.ok for result in results):
+        raise typer.Exit(code=1)
+
+
 def _expand_file_patterns(patterns: list[str]) -> list[str]:
     """Expand glob patterns and return list of files."""
     expanded_files = []
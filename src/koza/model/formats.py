@@ -10,6 +10,8 @@ class InputFormat(str, Enum):
     jsonl = "jsonl"
     json = "json"
     yaml = "yaml"
+    parquet = "parquet"
+    arrow = "arrow"
     # xml = "xml" # Not yet supported
 
 
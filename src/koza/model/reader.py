@@ -33,6 +33,13 @@ class HeaderMode(str, Enum):
     none = "none"
 
 
+class CSVEngine(str, Enum):
+    """Enum for the parsers available to the CSV reader"""
+
+    python = "python"
+    duckdb = "duckdb"
+
+
 @dataclass(config=PYDANTIC_CONFIG, frozen=True)
 class BaseReaderConfig:
     """Base configuration for all reader types.
@@ -41,11 +48,30 @@ class BaseReaderConfig:
         files: List of file paths to process.
         file_archive: Path to an archive file (zip/tar) containing data files.
         filters: List of column filters to apply to the data.
+        shard_key: Column whose (hashed) value assigns rows to shards when running with
+            `--shard i/n`. Without it, whole input files are assigned to shards instead.
+        split_workers: Number of worker processes to parse each uncompressed csv or jsonl
+            file with, each taking a newline-aligned byte range of the file. 0 disables splitting.
+        split_size: Approximate size in bytes of each byte range when `split_workers` is set.
+        preserve_order: Whether rows parsed in parallel are yielded in their original order.
+        archive_workers: Number of worker processes to parse the members of zip or tar archives
+            with, one member at a time each. 0 reads members one after another.
+        prefetch: Number of batches of rows to read and decode ahead of the transform on a
+            helper thread, overlapping decompression and I/O with the transform. 0 disables it.
+        mmap: Whether to read the lines of uncompressed local csv or jsonl files from a memory
+            map of the file rather than through a buffered text stream.
     """
 
     files: list[str] = field(default_factory=list)
     file_archive: str | None = None
     filters: list[ColumnFilter] = field(default_factory=list)
+    shard_key: str | None = None
+    split_workers: int = 0
+    split_size: int = 64 * 1024 * 1024
+    preserve_order: bool = True
+    archive_workers: int = 0
+    prefetch: int = 0
+    mmap: bool = False
 
 
 @dataclass(config=PYDANTIC_CONFIG, frozen=True)
@@ -61,6 +87,9 @@ class CSVReaderConfig(BaseReaderConfig):
     header_prefix: str | None = None
     skip_blank_lines: bool = True
     comment_char: str = "#"
+    engine: CSVEngine = CSVEngine.python
+    select_columns: list[str] | None = None
+    compact_rows: bool = False
 
     def __post_init__(self):
         # Format tab as delimiter
@@ -101,11 +130,24 @@ class CSVReaderConfig(BaseReaderConfig):
                     f" {', '.join([f'{quote}{c}{quote}' for c in extra_filtered_columns])}"
                 )
 
+            extra_selected_columns = OrderedSet(self.select_columns or []) - all_columns
+            if extra_selected_columns:
+                quote = "'"
+                raise ValueError(
+                    "One or more selected columns not present in designated CSV columns:"
+                    f" {', '.join([f'{quote}{c}{quote}' for c in extra_selected_columns])}"
+                )
+
+        # Rows are assigned to shards after columns are selected, so the key must be kept
+        if self.shard_key and self.select_columns is not None and self.shard_key not in self.select_columns:
+            raise ValueError(f"Shard key '{self.shard_key}' must be one of the selected columns")
+
 
 @dataclass(config=PYDANTIC_CONFIG, frozen=True)
 class JSONLReaderConfig(BaseReaderConfig):
     format: Literal[InputFormat.jsonl] = InputFormat.jsonl
     required_properties: list[str] | None = None
+    select_properties: list[str] | None = None
 
 
 @dataclass(config=PYDANTIC_CONFIG, frozen=True)
@@ -113,6 +155,7 @@ class JSONReaderConfig(BaseReaderConfig):
     format: Literal[InputFormat.json] = InputFormat.json
     required_properties: list[str] | None = None
     json_path: list[StrictStr | StrictInt] | None = None
+    streaming: bool = False
 
 
 @dataclass(config=PYDANTIC_CONFIG, frozen=True)
@@ -120,6 +163,35 @@ class YAMLReaderConfig(BaseReaderConfig):
     format: Literal[InputFormat.yaml] = InputFormat.yaml
     required_properties: list[str] | None = None
     json_path: list[StrictStr | StrictInt] | None = None
+    streaming: bool = False
+
+
+@dataclass(config=PYDANTIC_CONFIG, frozen=True)
+class ParquetReaderConfig(BaseReaderConfig):
+    """Configuration for Parquet files.
+
+    Attributes:
+        columns: Columns to read, or all columns if unset. Other columns are never decoded.
+        batch_size: Maximum number of rows decoded at a time.
+    """
+
+    format: Literal[InputFormat.parquet] = InputFormat.parquet
+    columns: list[str] | None = None
+    batch_size: int = 64 * 1024
+
+
+@dataclass(config=PYDANTIC_CONFIG, frozen=True)
+class ArrowReaderConfig(BaseReaderConfig):
+    """Configuration for Arrow IPC (Feather v2) files.
+
+    Attributes:
+        columns: Columns to read, or all columns if unset.
+        batch_size: Maximum number of rows decoded at a time.
+    """
+
+    format: Literal[InputFormat.arrow] = InputFormat.arrow
+    columns: list[str] | None = None
+    batch_size: int = 64 * 1024
 
 
 def get_reader_discriminator(model: Any):
@@ -134,6 +206,8 @@ ReaderConfig = Annotated[
         | Annotated[JSONLReaderConfig, Tag(InputFormat.jsonl)]
         | Annotated[JSONReaderConfig, Tag(InputFormat.json)]
         | Annotated[YAMLReaderConfig, Tag(InputFormat.yaml)]
+        | Annotated[ParquetReaderConfig, Tag(InputFormat.parquet)]
+        | Annotated[ArrowReaderConfig, Tag(InputFormat.arrow)]
     ),
     Discriminator(get_reader_discriminator),
 ]
@@ -1,4 +1,4 @@
-from collections.abc import Iterable
+from collections.abc import Generator, Iterable
 from pathlib import Path
 from tarfile import TarFile
 from typing import Any, TextIO
@@ -7,13 +7,22 @@ from zipfile import ZipFile
 from loguru import logger
 from tqdm import tqdm
 
+from koza.io.prefetch import Prefetcher
+from koza.io.reader.archive_reader import ArchiveReader
+from koza.io.reader.arrow_reader import ArrowReader
 from koza.io.reader.csv_reader import CSVReader
+from koza.io.reader.duckdb_csv_reader import DUCKDB_COMPRESSION, DuckDBCSVReader
 from koza.io.reader.json_reader import JSONReader
 from koza.io.reader.jsonl_reader import JSONLReader
-from koza.io.utils import open_resource
+from koza.io.reader.split_reader import SplitReader
+from koza.io.utils import SizedResource, is_archive_name, open_resource
 from koza.model.formats import InputFormat
-from koza.model.reader import ReaderConfig
+from koza.model.reader import CSVEngine, CSVReaderConfig, JSONLReaderConfig, ReaderConfig
 from koza.utils.row_filter import RowFilter
+from koza.utils.shard import Shard
+
+#: How many rows are read between progress bar updates
+PROGRESS_INTERVAL = 1024
 
 
 class Source:
@@ -25,6 +34,7 @@ class Source:
 
     config: Source config
     row_limit: Number of rows to process
+    shard: Only process the files (or, with `shard_key` configured, the rows) in this shard
     reader: An iterator that takes in an IO[str] and yields a dictionary
     """
 
@@ -34,15 +44,23 @@ class Source:
         base_directory: Path,
         row_limit: int = 0,
         show_progress: bool = False,
+        shard: Shard | None = None,
     ):
         self.reader_config = config
         self.base_directory = base_directory
 
         self.row_limit = row_limit
         self.show_progress = show_progress
+        self.shard = shard
+        self.num_rows = 0
+        #: Seconds spent waiting on the prefetch buffer (see the `prefetch` reader option)
+        self.prefetch_stall_time = 0.0
+        self.resource_names: list[str] = []
         self._filter = RowFilter(config.filters)
         self._reader = None
         self._readers: list[Iterable[dict[str, Any]]] = []
+        # The resource each reader reads, or None for readers of several resources
+        self._resources: list[SizedResource | None] = []
         self.last_row: dict[str, Any] | None = None
         self._opened: list[ZipFile | TarFile | TextIO] = []
 
@@ -53,7 +71,23 @@ class Source:
             path = self.base_directory / path
         return path
 
-    def _open_files(self):
+    def _open_files(self) -> Generator[tuple[Iterable[dict[str, Any]], SizedResource | None], None, int]:
+        """
+        Open the input files, yielding each reader (with the resource it reads) as it is created
+
+        Files are only opened once the readers before them have been consumed, so that the members
+        of a tar archive can be read in a single forward pass through it.
+
+        When sharding by file, each archive member takes a position, so archives are opened by every
+        shard. Other files take one position each, and aren't opened (or downloaded) by other shards;
+        which files are archives is decided by their name, so that all shards number them the same.
+        """
+        self._readers = []
+        self._resources = []
+        self._opened = []
+        self.resource_names = []
+        position = 0
+
         # Handle file_archive separately from regular files
         # If file_archive is specified, open it and filter files from it
         # Otherwise, open files directly
@@ -62,121 +96,245 @@ class Source:
             if not archive_path.is_absolute():
                 archive_path = self.base_directory / archive_path
 
-            opened_resource = open_resource(archive_path)
+            opened_resource = open_resource(archive_path, stream=True)
             if isinstance(opened_resource, tuple):
                 archive, resources = opened_resource
                 self._opened.append(archive)
 
                 # Filter resources if files list is provided
-                for resource in resources:
+                members = (
+                    resource
+                    for resource in resources
                     # If files list is specified, only process matching files
-                    if self.reader_config.files and resource.name not in self.reader_config.files:
-                        continue
-
-                    self._opened.append(resource.reader)
-                    if self.reader_config.format == InputFormat.csv:
-                        self._readers.append(
-                            CSVReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    elif self.reader_config.format == InputFormat.jsonl:
-                        self._readers.append(
-                            JSONLReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    elif self.reader_config.format == InputFormat.json or self.reader_config.format == InputFormat.yaml:
-                        self._readers.append(
-                            JSONReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    else:
-                        raise ValueError(f"File type {self.reader_config.format} not supported")
+                    if not self.reader_config.files or resource.name in self.reader_config.files
+                )
+                position = yield from self._add_resources(members, position, archive)
         else:
             # Process regular files
             for file_str in self.reader_config.files:
                 file_path = self._resolve_file_path(file_str)
-                opened_resource = open_resource(file_path)
+                is_archive = is_archive_name(file_path)
+                if not is_archive and not self._in_shard(position):
+                    position += 1
+                    continue
+
+                opened_resource = open_resource(file_path, stream=True)
                 if isinstance(opened_resource, tuple):
                     archive, resources = opened_resource
                     self._opened.append(archive)
+                    # An archive that isn't named like one is kept whole, at the single position of a file
+                    position = yield from self._add_resources(resources, position, archive, by_member=is_archive)
                 else:
-                    resources = [opened_resource]
-
-                for resource in resources:
-                    self._opened.append(resource.reader)
-                    if self.reader_config.format == InputFormat.csv:
-                        self._readers.append(
-                            CSVReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    elif self.reader_config.format == InputFormat.jsonl:
-                        self._readers.append(
-                            JSONLReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    elif self.reader_config.format == InputFormat.json or self.reader_config.format == InputFormat.yaml:
-                        self._readers.append(
-                            JSONReader(
-                                resource.reader,
-                                config=self.reader_config,
-                            )
-                        )
-                    else:
-                        raise ValueError(f"File type {self.reader_config.format} not supported")
+                    position = yield from self._add_resources([opened_resource], position)
+
+        return position
+
+    def _add_resources(
+        self,
+        resources: Iterable[SizedResource],
+        position: int,
+        archive: ZipFile | TarFile | None = None,
+        by_member: bool = True,
+    ) -> Generator[tuple[Iterable[dict[str, Any]], SizedResource | None], None, int]:
+        """
+        Add and yield readers for the resources in this shard, returning the position after the last one
+
+        Each resource takes a position, unless `by_member` is False, when they all share `position`.
+        """
+        members: list[str] = []
+        for resource in resources:
+            self._opened.append(resource.reader)
+            if self._in_shard(position):
+                if archive is not None and self.reader_config.archive_workers:
+                    members.append(resource.name)
+                else:
+                    self._add_reader(resource)
+                    yield self._readers[-1], resource
+            if by_member:
+                position += 1
+        if not by_member:
+            position += 1
+
+        if members:
+            archive_path = str(archive.filename if isinstance(archive, ZipFile) else archive.name)
+            self.resource_names.extend(members)
+            self._resources.append(None)
+            self._readers.append(
+                ArchiveReader(
+                    archive_path,
+                    members,
+                    config=self.reader_config,
+                    workers=self.reader_config.archive_workers,
+                    preserve_order=self.reader_config.preserve_order,
+                )
+            )
+            yield self._readers[-1], None
+        return position
+
+    def _in_shard(self, position: int) -> bool:
+        # Whole files are only assigned to shards when rows aren't assigned by key
+        if self.shard is None or self.reader_config.shard_key:
+            return True
+        return self.shard.includes_position(position)
+
+    def _add_reader(self, resource: SizedResource):
+        self.resource_names.append(resource.name)
+        self._resources.append(resource)
+        if isinstance(self.reader_config, CSVReaderConfig) and self.reader_config.engine == CSVEngine.duckdb:
+            if resource.path is not None and resource.compression in DUCKDB_COMPRESSION:
+                # DuckDB already parses in parallel, so `split_workers` doesn't apply
+                self._readers.append(DuckDBCSVReader(resource, config=self.reader_config))
+                return
+            logger.warning(
+                f"Cannot read {resource.name} with DuckDB since it is remote, archived or "
+                f"{resource.compression} compressed; using python"
+            )
+
+        if self.reader_config.split_workers:
+            if not isinstance(self.reader_config, CSVReaderConfig | JSONLReaderConfig):
+                raise ValueError(f"Splitting files is not supported for {self.reader_config.format} files")
+            if resource.raw is not None:
+                self._readers.append(
+                    SplitReader(
+                        resource,
+                        config=self.reader_config,
+                        workers=self.reader_config.split_workers,
+                        split_size=self.reader_config.split_size,
+                        preserve_order=self.reader_config.preserve_order,
+                    )
+                )
+                return
+            logger.warning(f"Cannot split {resource.name} since it is compressed or archived; reading it serially")
+
+        raw = None
+        if self.reader_config.mmap:
+            if not isinstance(self.reader_config, CSVReaderConfig | JSONLReaderConfig):
+                raise ValueError(f"Memory mapping files is not supported for {self.reader_config.format} files")
+            if resource.raw is None:
+                logger.warning(f"Cannot memory map {resource.name} since it is compressed or archived")
+            raw = resource.raw
+
+        if self.reader_config.format == InputFormat.csv:
+            self._readers.append(
+                CSVReader(
+                    resource.reader,
+                    config=self.reader_config,
+                    raw=raw,
+                )
+            )
+        elif self.reader_config.format == InputFormat.jsonl:
+            self._readers.append(
+                JSONLReader(
+                    resource.reader,
+                    config=self.reader_config,
+                    raw=raw,
+                )
+            )
+        elif self.reader_config.format == InputFormat.json or self.reader_config.format == InputFormat.yaml:
+            self._readers.append(
+                JSONReader(
+                    resource.reader,
+                    config=self.reader_config,
+                )
+            )
+        elif self.reader_config.format == InputFormat.parquet or self.reader_config.format == InputFormat.arrow:
+            self._readers.append(
+                ArrowReader(
+                    resource,
+                    config=self.reader_config,
+                )
+            )
+        else:
+            raise ValueError(f"File type {self.reader_config.format} not supported")
 
     def __iter__(self):
-        self._open_files()
+        readers = self._open_files()
         num_rows = 0
+        self.num_rows = 0
+        self.prefetch_stall_time = 0.0
+        shard_key = self.reader_config.shard_key if self.shard else None
 
-        for reader in self._readers:
-            pbar: tqdm[dict[str, Any]] | None = None
-            numlines = 0
+        for reader, resource in readers:
+            pbar = self._progress_bar(reader, resource)
+            pbar_rows = 0
 
-            if self.show_progress and isinstance(reader, CSVReader):
-                _ = reader.header
-                numlines = sum(1 for _ in reader.io_str)
-                pbar = tqdm(reader, total=numlines, leave=True)
-                reader.reset()
+            # Some readers check rows against the filters themselves
+            row_filter = None if getattr(reader, "applies_filters", False) else self._filter
 
-            if self.show_progress and isinstance(reader, JSONLReader):
-                numlines = sum(1 for _ in reader.io_str)
-                reader.io_str.seek(0)
-                pbar = tqdm(reader, total=numlines, leave=True)
+            rows: Iterable[dict[str, Any]] = reader
+            if self.reader_config.prefetch:
+                rows = Prefetcher(reader, depth=self.reader_config.prefetch)
 
-            for item in reader:
-                if pbar is not None:
-                    pbar.update(1)
+            try:
+                for item in rows:
+                    if pbar is not None:
+                        pbar_rows += 1
+                        if pbar_rows == PROGRESS_INTERVAL:
+                            self._update_progress(pbar, resource, pbar_rows)
+                            pbar_rows = 0
 
-                if self._filter and not self._filter.include_row(item):
-                    # Deferred formatting: only render the row if DEBUG is enabled.
-                    logger.debug("Row filtered out: {}", item)
-                    continue
+                    if row_filter and not row_filter.include_row(item):
+                        # Deferred formatting: only render the row if DEBUG is enabled.
+                        logger.debug("Row filtered out: {}", item)
+                        continue
 
-                self.last_row = item
+                    if shard_key is not None and not self._row_in_shard(item, shard_key):
+                        continue
 
-                yield item
+                    self.last_row = item
 
-                num_rows += 1
-                if self.row_limit and num_rows == self.row_limit:
-                    logger.info(f"Reached row limit {self.row_limit} (read {num_rows})")
-                    break
+                    yield item
 
-            else:
-                # If this reader was consumed without breaking, continue on to the next reader
-                continue
+                    num_rows += 1
+                    self.num_rows = num_rows
+                    if self.row_limit and num_rows == self.row_limit:
+                        logger.info(f"Reached row limit {self.row_limit} (read {num_rows})")
+                        break
 
-            # If it did break (i.e. it reached its row limit), then do not proceed to the next reader
-            break
+                else:
+                    # If this reader was consumed without breaking, continue on to the next reader
+                    continue
+
+                # If it did break (i.e. it reached its row limit), then do not proceed to the next reader
+                break
+            finally:
+                if isinstance(rows, Prefetcher):
+                    rows.close()
+                    self.prefetch_stall_time += rows.stall_time
+                if pbar is not None:
+                    self._update_progress(pbar, resource, pbar_rows)
+                    pbar.close()
+
+        readers.close()
+
+        if self.reader_config.prefetch:
+            logger.info(f"Waited {self.prefetch_stall_time:.2f}s for prefetched input rows")
 
         for fh in self._opened:
             fh.close()
+
+    def _progress_bar(self, reader: Iterable[dict[str, Any]], resource: SizedResource | None) -> tqdm | None:
+        """
+        Create a progress bar for a reader, measured in bytes of the resource consumed
+        where that reflects the reader's progress, and in rows otherwise
+        """
+        if not self.show_progress:
+            return None
+        if resource is None:
+            return tqdm(desc=getattr(reader, "name", None), unit=" rows", leave=True)
+        # These readers parse the file through their own handles, so `tell` doesn't move
+        if isinstance(reader, SplitReader | DuckDBCSVReader | ArrowReader):
+            return tqdm(desc=resource.name, unit=" rows", leave=True)
+        return tqdm(desc=resource.name, total=resource.size, unit="B", unit_scale=True, leave=True)
+
+    def _update_progress(self, pbar: tqdm, resource: SizedResource | None, rows: int):
+        if resource is None or pbar.total is None:
+            pbar.update(rows)
+        else:
+            pbar.update(resource.tell() - pbar.n)
+
+    def _row_in_shard(self, row: dict[str, Any], shard_key: str) -> bool:
+        assert self.shard is not None
+        if shard_key not in row:
+            raise ValueError(f"Shard key `{shard_key}` is missing from row: {row}")
+        return self.shard.includes_value(row[shard_key])
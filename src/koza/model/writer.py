@@ -15,3 +15,6 @@ class WriterConfig:
     min_edge_count: int | None = None
     max_node_count: int | None = None
     max_edge_count: int | None = None
+    #: When greater than 0, serialize and write entities on a background thread, through a
+    #: queue holding at most this many batches of entities
+    async_queue_size: int = 0
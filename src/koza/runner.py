@@ -1,10 +1,16 @@
 import importlib
 import importlib.util
+import json
+import multiprocessing
+import queue
 import sys
-from collections import defaultdict
-from collections.abc import Iterable
+import time
+import traceback
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
-from itertools import chain
+from itertools import chain, islice
 from pathlib import Path
 from types import ModuleType
 from typing import Any, TypeAlias, TypeVar, cast
@@ -14,8 +20,10 @@ from loguru import logger
 from mergedeep import merge
 
 from koza import decorators
+from koza.io.writer.async_writer import AsyncWriter
 from koza.io.writer.jsonl_writer import JSONLWriter
 from koza.io.writer.passthrough_writer import PassthroughWriter
+from koza.io.writer.synchronized_writer import SynchronizedWriter
 from koza.io.writer.tsv_writer import TSVWriter
 from koza.io.writer.writer import KozaWriter
 from koza.io.yaml_loader import UniqueIncludeLoader
@@ -24,11 +32,17 @@ from koza.model.graphs import KnowledgeGraph
 from koza.model.koza import KozaConfig
 from koza.model.source import Source
 from koza.transform import KozaTransform, Mappings, Record
-from koza.utils.exceptions import NoTransformException
+from koza.utils.exceptions import NoTransformException, TransformWorkerError
+from koza.utils.shard import Shard
 
 T = TypeVar("T", bound=decorators.KozaTransformHook)
 TaggedFunctions: TypeAlias = dict[str | None, list[T]]
 
+# Number of records sent to a worker process at a time when running with `workers`
+WORKER_BATCH_SIZE = 1000
+# Seconds to block on a worker queue before checking whether any worker has failed
+_WORKER_POLL_INTERVAL = 1.0
+
 
 def get_instances(cls: type[T], from_list: list[Any]) -> list[T]:
     return [x for x in from_list if isinstance(x, cls)]
@@ -39,10 +53,46 @@ class KozaTransformHooks:
     prepare_data: list[decorators.KozaPrepareDataFunction] = field(default_factory=list)
     transform: list[decorators.KozaSingleTransformFunction] = field(default_factory=list)
     transform_record: list[decorators.KozaSerialTransformFunction] = field(default_factory=list)
+    transform_batch: list[decorators.KozaBatchTransformFunction] = field(default_factory=list)
     on_data_begin: list[decorators.KozaDataBeginFunction] = field(default_factory=list)
     on_data_end: list[decorators.KozaDataEndFunction] = field(default_factory=list)
 
 
+def merge_transform_metadata(metadata: dict[str, Any], worker_metadata: dict[str, Any]):
+    """
+    Merge a worker's `transform_metadata` into `metadata`, in place
+
+    Only values a transform marks as additive are combined: `Counter`s that several workers
+    set under the same key are summed, and dicts are merged recursively by these same rules.
+    Any other value (such as a version or a maximum) is kept while the workers agree on it;
+    if a later worker sets a different value, the first worker's is kept, with a warning.
+    """
+    for key, value in worker_metadata.items():
+        if key not in metadata:
+            metadata[key] = value
+            continue
+
+        current = metadata[key]
+        if isinstance(value, Counter) and isinstance(current, Counter):
+            # Unlike `+`, `update` keeps counts that are zero or negative
+            metadata[key] = Counter(current)
+            metadata[key].update(value)
+        elif isinstance(value, dict) and isinstance(current, dict) and not isinstance(value, Counter):
+            metadata[key] = dict(current)
+            merge_transform_metadata(metadata[key], value)
+        elif value != current:
+            logger.warning(
+                f"Workers set different values for transform metadata `{key}`; keeping the first, {current!r}"
+            )
+
+
+def batched(data: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Split an iterable into lists of (at most) `size` items."""
+    iterator = iter(data)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 def load_transform(transform_module: ModuleType | None) -> dict[str | None, KozaTransformHooks]:
     if transform_module is None:
         return {}
@@ -53,6 +103,7 @@ def load_transform(transform_module: ModuleType | None) -> dict[str | None, Koza
         "prepare_data": decorators.KozaPrepareDataFunction,
         "transform": decorators.KozaSingleTransformFunction,
         "transform_record": decorators.KozaSerialTransformFunction,
+        "transform_batch": decorators.KozaBatchTransformFunction,
         "on_data_begin": decorators.KozaDataBeginFunction,
         "on_data_end": decorators.KozaDataEndFunction,
     }
@@ -87,7 +138,14 @@ class KozaRunner:
         input_files_dir: Path | None = None,
         mapping_filenames: list[str] | None = None,
         extra_transform_fields: dict[str, Any] | None = None,
+        workers: int = 1,
+        shard: Shard | None = None,
+        manifest_path: Path | None = None,
+        tag_workers: int = 1,
     ):
+        if workers > 1 and tag_workers > 1:
+            raise ValueError("Cannot combine multiple workers with multiple tag workers")
+
         if isinstance(data, dict):
             # This cast is necessary because a dict with Records as keys is an
             # Iterable[Record]. So... don't pass a dict with records as its keys.
@@ -100,30 +158,47 @@ class KozaRunner:
         self.mapping_filenames = mapping_filenames or []
         self.extra_transform_fields = extra_transform_fields or {}
         self.transform_metadata: dict[str, Any] = {}
+        self.workers = workers
+        self.shard = shard
+        self.manifest_path = manifest_path
+        self.tag_workers = tag_workers
+        self.tag_timings: dict[str | None, float] = {}
 
         if isinstance(hooks, dict):
             self.hooks_by_tag = hooks
         else:
             self.hooks_by_tag: dict[str | None, KozaTransformHooks] = {None: hooks}
 
-    def run_for_tag(self, tag: str | None, mappings: Mappings):
+    def run_for_tag(self, tag: str | None, mappings: Mappings, writer: KozaWriter | None = None):
+        writer = writer or self.writer
         data = self.data[tag]
         hooks = self.hooks_by_tag.get(tag, None)
 
-        if hooks is None or (not hooks.transform and not hooks.transform_record):
-            raise NoTransformException("Must define one of `@koza.transform` or `@koza.transform_record`")
+        if hooks is None or (not hooks.transform and not hooks.transform_record and not hooks.transform_batch):
+            raise NoTransformException(
+                "Must define one of `@koza.transform`, `@koza.transform_record` or `@koza.transform_batch`"
+            )
+
+        if sum(bool(fns) for fns in (hooks.transform, hooks.transform_record, hooks.transform_batch)) > 1:
+            raise ValueError(
+                "Can only define one of `@koza.transform`, `@koza.transform_record` or `@koza.transform_batch`"
+            )
 
-        if hooks.transform and hooks.transform_record:
-            raise ValueError("Can only define one of `@koza.transform` or `@koza.transform_record`")
+        if len(hooks.transform_batch) > 1:
+            raise ValueError("Can only define one `@koza.transform_batch` function")
 
-        if not hooks.transform_record and len(hooks.transform) > 1:
+        if len(hooks.transform) > 1:
             raise ValueError("Can only define one `@koza.transform` function")
 
         if hooks.prepare_data and len(hooks.prepare_data) > 1:
             raise ValueError("Can only define one `@koza.prepare_data` function")
 
+        if self.workers > 1:
+            self.run_for_tag_in_workers(tag, hooks, mappings)
+            return
+
         transform = KozaTransform(mappings=mappings,
-                                  writer=self.writer,
+                                  writer=writer,
                                   input_files_dir=self.input_files_dir,
                                   extra_fields=self.extra_transform_fields)
 
@@ -147,40 +222,257 @@ class KozaRunner:
                 if isinstance(first_result, KnowledgeGraph):
                     for kg in results:
                         # for results that are KnowledgeGraphs, write the nodes and edges explicitly
-                        self.writer.write_nodes(kg.nodes)
-                        self.writer.write_edges(kg.edges)
+                        writer.write_nodes(kg.nodes)
+                        writer.write_edges(kg.edges)
                 else:
                     # otherwise rely on the writer to handle all the entities appropriately
-                    self.writer.write(results)
+                    writer.write(results)
 
         elif hooks.transform_record:
             logger.info("Running serial transform")
             for item in data:
-                for transform_record_fn in hooks.transform_record:
-                    result = transform_record_fn(transform, item)
-                    if result is not None:
-                        if isinstance(result, KnowledgeGraph):
-                            self.writer.write_nodes(result.nodes)
-                            self.writer.write_edges(result.edges)
-                        else:
-                            self.writer.write(result)
+                self._transform_record(hooks, transform, item)
+
+        elif hooks.transform_batch:
+            logger.info("Running batch transform")
+            for batch in batched(data, hooks.transform_batch[0].batch_size):
+                self._transform_batch(hooks, transform, batch)
 
         for fn in hooks.on_data_end:
             fn(transform)
 
         self.transform_metadata.update(transform.transform_metadata)
 
+    @staticmethod
+    def _transform_record(hooks: KozaTransformHooks, transform: KozaTransform, item: Any):
+        for transform_record_fn in hooks.transform_record:
+            result = transform_record_fn(transform, item)
+            if result is not None:
+                if isinstance(result, KnowledgeGraph):
+                    transform.writer.write_nodes(result.nodes)
+                    transform.writer.write_edges(result.edges)
+                else:
+                    transform.writer.write(result)
+
+    @staticmethod
+    def _transform_batch(hooks: KozaTransformHooks, transform: KozaTransform, batch: list[Any]):
+        transform_batch_fn = hooks.transform_batch[0]
+        if transform_batch_fn.columnar:
+            columns: dict[str, list[Any]] = {key: [] for record in batch for key in record}
+            for record in batch:
+                for key, values in columns.items():
+                    values.append(record.get(key))
+            result = transform_batch_fn(transform, columns)
+        else:
+            result = transform_batch_fn(transform, batch)
+
+        if result is not None:
+            if isinstance(result, KnowledgeGraph):
+                transform.writer.write_nodes(result.nodes)
+                transform.writer.write_edges(result.edges)
+            else:
+                transform.writer.write(result)
+
+    def run_for_tag_in_workers(self, tag: str | None, hooks: KozaTransformHooks, mappings: Mappings):
+        """Run the `@koza.transform_record` (or `@koza.transform_batch`) hooks for a tag in
+        `self.workers` forked processes.
+
+        Records (after `@koza.prepare_data`, which runs in this process) are sent to the
+        workers in batches (each batch is one call of a `@koza.transform_batch` hook).
+        Every worker has its own `KozaTransform` and writes to its own writer shard:
+        `@koza.on_data_begin` and `@koza.on_data_end` run once per worker against that
+        worker's transform, so `koza.state` is per-worker. Once all workers
+        have finished, their shards are merged into this runner's writer and their
+        `transform_metadata` is merged into the runner's, in worker order (see
+        `merge_transform_metadata`).
+        """
+        if hooks.transform:
+            raise ValueError(
+                "Running with multiple workers requires `@koza.transform_record` or `@koza.transform_batch`"
+            )
+
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError as e:
+            raise ValueError("Running with multiple workers requires the `fork` multiprocessing start method") from e
+
+        data: Iterable[Any] = self.data[tag]
+        if hooks.prepare_data:
+            prepare_transform = KozaTransform(
+                mappings=mappings,
+                writer=self.writer,
+                input_files_dir=self.input_files_dir,
+                extra_fields=self.extra_transform_fields,
+            )
+            data = hooks.prepare_data[0](prepare_transform, data)
+
+        shards = [f"worker-{i}" for i in range(self.workers)]
+        batch_queue = context.Queue(maxsize=self.workers * 2)
+        result_queue = context.Queue()
+        processes = [
+            context.Process(
+                target=self._transform_worker,
+                args=(hooks, mappings, shard, batch_queue, result_queue),
+                daemon=True,
+            )
+            for shard in shards
+        ]
+
+        batch_size = hooks.transform_batch[0].batch_size if hooks.transform_batch else WORKER_BATCH_SIZE
+
+        transform_type = "batch" if hooks.transform_batch else "serial"
+        logger.info(f"Running {transform_type} transform in {self.workers} worker processes")
+        for process in processes:
+            process.start()
+
+        results: dict[str, dict[str, Any]] = {}
+        try:
+            for batch in batched(data, batch_size):
+                self._put_batch(batch, batch_queue, result_queue, processes, results)
+            for _ in processes:
+                self._put_batch(None, batch_queue, result_queue, processes, results)
+
+            while len(results) < len(processes):
+                self._collect_worker_result(result_queue, processes, results)
+        finally:
+            for process in processes:
+                process.join(timeout=_WORKER_POLL_INTERVAL)
+                if process.is_alive():
+                    process.terminate()
+
+        for shard in shards:
+            self.writer.merge_shard(shard)
+            merge_transform_metadata(self.transform_metadata, results[shard])
+
+    def _transform_worker(
+        self,
+        hooks: KozaTransformHooks,
+        mappings: Mappings,
+        shard: str,
+        batch_queue,
+        result_queue,
+    ):
+        try:
+            writer = self.writer.with_shard(shard)
+            transform = KozaTransform(
+                mappings=mappings,
+                writer=writer,
+                input_files_dir=self.input_files_dir,
+                extra_fields=self.extra_transform_fields,
+            )
+
+            for fn in hooks.on_data_begin:
+                fn(transform)
+
+            while (batch := batch_queue.get()) is not None:
+                if hooks.transform_batch:
+                    self._transform_batch(hooks, transform, batch)
+                else:
+                    for item in batch:
+                        self._transform_record(hooks, transform, item)
+
+            for fn in hooks.on_data_end:
+                fn(transform)
+
+            writer.finalize()
+            result_queue.put(("done", shard, transform.transform_metadata))
+        except BaseException:
+            result_queue.put(("error", shard, traceback.format_exc()))
+
+    @staticmethod
+    def _put_batch(batch, batch_queue, result_queue, processes, results):
+        # Block until there is room for the batch, but keep an eye out for failed workers
+        # so that a dead pool doesn't leave us waiting on a full queue forever.
+        while True:
+            try:
+                batch_queue.put(batch, timeout=_WORKER_POLL_INTERVAL)
+                return
+            except queue.Full:
+                KozaRunner._collect_worker_result(result_queue, processes, results, block=False)
+
+    @staticmethod
+    def _collect_worker_result(result_queue, processes, results, block: bool = True):
+        try:
+            status, shard, payload = result_queue.get(timeout=_WORKER_POLL_INTERVAL if block else 0)
+        except queue.Empty:
+            for process in processes:
+                if not process.is_alive() and process.exitcode not in (0, None):
+                    raise TransformWorkerError(f"Worker process exited with code {process.exitcode}") from None
+            return
+
+        if status == "error":
+            raise TransformWorkerError(f"Transform failed in {shard}:\n{payload}")
+        results[shard] = payload
+
     def run(self):
         mappings = self.load_mappings()
 
-        for tag in self.data:
-            self.run_for_tag(tag, mappings)
+        if self.tag_workers > 1 and len(self.data) > 1:
+            self.run_tags_concurrently(mappings)
+        else:
+            for tag in self.data:
+                self.run_timed_for_tag(tag, mappings)
 
         self.writer.finalize()
         self.writer.validate_counts()
 
+        if self.manifest_path is not None:
+            self.write_manifest(self.manifest_path)
+
         return self.writer
 
+    def run_timed_for_tag(self, tag: str | None, mappings: Mappings, writer: KozaWriter | None = None):
+        start = time.perf_counter()
+        self.run_for_tag(tag, mappings, writer)
+        self.tag_timings[tag] = time.perf_counter() - start
+
+        if tag is not None:
+            logger.info(f"[{tag}] Transform finished in {self.tag_timings[tag]:.2f}s")
+
+    def run_tags_concurrently(self, mappings: Mappings):
+        """Run the pipeline for each tag in a pool of `self.tag_workers` threads.
+
+        All tags write through a single `SynchronizedWriter` wrapping this runner's
+        writer, so output from different tags may be interleaved. The first exception
+        raised by any tag is re-raised once every tag has stopped.
+        """
+        writer = SynchronizedWriter(self.writer)
+        logger.info(f"Running {len(self.data)} tags in {self.tag_workers} threads")
+        with ThreadPoolExecutor(max_workers=self.tag_workers, thread_name_prefix="koza-tag") as executor:
+            futures = [executor.submit(self.run_timed_for_tag, tag, mappings, writer) for tag in self.data]
+        for future in futures:
+            future.result()
+
+    def write_manifest(self, path: Path):
+        """Record which inputs this run read and which outputs it wrote.
+
+        Mostly useful for sharded runs, where each shard's manifest lists the files
+        (and row counts) that were assigned to it.
+        """
+        inputs = []
+        for tag, data in self.data.items():
+            entry: dict[str, Any] = {"tag": tag}
+            if isinstance(data, Source):
+                entry["files"] = data.resource_names
+                entry["rows"] = data.num_rows
+                entry["shard_key"] = data.reader_config.shard_key
+            if tag in self.tag_timings:
+                entry["seconds"] = round(self.tag_timings[tag], 3)
+            inputs.append(entry)
+
+        manifest = {
+            "shard": None if self.shard is None else {"index": self.shard.index, "count": self.shard.count},
+            "inputs": inputs,
+            "outputs": self.writer.output_files(),
+            "node_count": self.writer.node_count,
+            "edge_count": self.writer.edge_count,
+            "transform_metadata": self.transform_metadata,
+        }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as fh:
+            json.dump(manifest, fh, indent=2, default=str)
+
     def load_mappings(self):
         mappings: Mappings = {}
 
@@ -244,6 +536,9 @@ class KozaRunner:
         input_files_dir: str = "",
         row_limit: int = 0,
         show_progress: bool = False,
+        workers: int = 1,
+        shard: Shard | None = None,
+        tag_workers: int = 1,
     ):
         module_name: str | None = None
         transform_module: ModuleType | None = None
@@ -275,29 +570,34 @@ class KozaRunner:
         hooks_by_tag = load_transform(transform_module)
 
         sources_by_tag: dict[str | None, Iterable[Record]] = {
-            reader.tag: iter(
-                Source(
-                    reader.reader,
-                    base_directory,
-                    row_limit=row_limit,
-                    show_progress=show_progress,
-                )
+            reader.tag: Source(
+                reader.reader,
+                base_directory,
+                row_limit=row_limit,
+                show_progress=show_progress,
+                shard=shard,
             )
             for reader in config.get_readers()
         }
 
         writer: KozaWriter | None = None
+        writer_shard = shard.name if shard else None
 
         if config.writer.format == OutputFormat.tsv:
-            writer = TSVWriter(output_dir=output_dir, source_name=config.name, config=config.writer)
+            writer = TSVWriter(output_dir=output_dir, source_name=config.name, config=config.writer, shard=writer_shard)
         elif config.writer.format == OutputFormat.jsonl:
-            writer = JSONLWriter(output_dir=output_dir, source_name=config.name, config=config.writer)
+            writer = JSONLWriter(
+                output_dir=output_dir, source_name=config.name, config=config.writer, shard=writer_shard
+            )
         elif config.writer.format == OutputFormat.passthrough:
             writer = PassthroughWriter(config=config.writer)
 
         if writer is None:
             raise ValueError("No writer defined")
 
+        if config.writer.async_queue_size > 0:
+            writer = AsyncWriter(writer, queue_size=config.writer.async_queue_size)
+
         return cls(
             data=sources_by_tag,
             writer=writer,
@@ -306,6 +606,10 @@ class KozaRunner:
             mapping_filenames=config.transform.mappings,
             extra_transform_fields=config.transform.extra_fields,
             hooks=hooks_by_tag,
+            workers=workers,
+            shard=shard,
+            tag_workers=tag_workers,
+            manifest_path=Path(output_dir) / f"{config.name}_manifest.{shard.name}.json" if shard else None,
         )
 
     @classmethod
@@ -319,6 +623,9 @@ class KozaRunner:
         input_files_dir: str | None = None,
         show_progress: bool = False,
         overrides: dict | None = None,
+        workers: int = 1,
+        shard: Shard | None = None,
+        tag_workers: int = 1,
     ):
         transform_code_path: Path | None = None
         config_path = Path(config_filename)
@@ -406,4 +713,7 @@ class KozaRunner:
             input_files_dir=input_files_dir,
             row_limit=row_limit,
             show_progress=show_progress,
+            workers=workers,
+            shard=shard,
+            tag_workers=tag_workers,
         )
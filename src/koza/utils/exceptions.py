@@ -20,3 +20,7 @@ class NoTransformException(ValueError):
 
 class CountValidationError(ValueError):
     """Raised when a writer's node or edge count violates its configured min/max bounds"""
+
+
+class TransformWorkerError(RuntimeError):
+    """Raised when a worker process fails during a multi-process transform"""
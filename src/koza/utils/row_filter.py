@@ -1,13 +1,87 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from operator import eq, ge, gt, le, lt, ne
 from typing import Any
 
-from koza.model.filters import ColumnFilter, FilterInclusion
+from koza.model.filters import ColumnFilter, FilterCode, FilterInclusion
+
+COMPARISONS: dict[str, Callable[[Any, Any], bool]] = {
+    FilterCode.gt: gt,
+    FilterCode.ge: ge,
+    FilterCode.lt: lt,
+    FilterCode.lte: le,
+    FilterCode.eq: eq,
+    FilterCode.ne: ne,
+}
+
+
+class SubstringMatcher:
+    """
+    Checks whether a string contains any of a set of patterns
+
+    Patterns are grouped by length, so matching costs one set lookup per distinct pattern
+    length at each offset of the string, however many patterns there are. Allow-lists of
+    identifiers (such as taxa) have only a few distinct lengths.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        by_length: dict[int, set[str]] = {}
+        for pattern in patterns:
+            by_length.setdefault(len(pattern), set()).add(pattern)
+        self.match_all = 0 in by_length
+        self.by_length = [(length, frozenset(by_length[length])) for length in sorted(by_length) if length]
+
+    def __call__(self, value: str) -> bool:
+        if self.match_all:
+            return True
+        for length, patterns in self.by_length:
+            for start in range(len(value) - length + 1):
+                if value[start : start + length] in patterns:
+                    return True
+        return False
+
+
+def _inlist(filter_values: list[Any], exact: bool) -> Callable[[Any], bool]:
+    values = frozenset(filter_values)
+    # `in` also matches strings that contain any of the filter's strings
+    contains = None if exact else SubstringMatcher(value for value in filter_values if isinstance(value, str))
+
+    def match(column_value: Any) -> bool:
+        try:
+            if column_value in values:
+                return True
+        except TypeError:
+            # Unhashable values (e.g. lists from JSON) can't equal any filter value
+            return False
+        return contains is not None and isinstance(column_value, str) and contains(column_value)
+
+    return match
+
+
+def compile_filter(column_filter: ColumnFilter) -> Callable[[Any], bool]:
+    """Build a function that checks a (non-None) column value against a filter"""
+    filter_code = column_filter.filter_code
+    if filter_code in COMPARISONS:
+        comparison = COMPARISONS[filter_code]
+        filter_value = column_filter.value
+
+        def match(column_value: Any) -> bool:
+            return comparison(column_value, filter_value)
+
+    elif filter_code in (FilterCode.inlist, FilterCode.inlist_exact):
+        match = _inlist(column_filter.value, exact=filter_code == FilterCode.inlist_exact)
+    else:
+        raise ValueError(f"No such operator for filter code `{filter_code}`")
+
+    if column_filter.inclusion == FilterInclusion.exclude:
+        return lambda column_value: not match(column_value)
+    return match
 
 
 class RowFilter:
     """
     A Filter class that is initialized with a List of column filters, each specifying a column, an operator and a value
+
+    The filters are compiled once, into a function per filter, rather than interpreted for every row.
     """
 
     def __init__(self, filters: list[ColumnFilter] | None = None):
@@ -15,69 +89,20 @@ class RowFilter:
         :param filters: A collection of Filters to be applied
         """
         self.filters = filters
-        self.operators: dict[str, Callable[[Any, Any], bool]] = {
-            "gt": gt,
-            "ge": ge,
-            "lt": lt,
-            "le": le,
-            "eq": eq,
-            "ne": ne,
-            "in": self.inlist,  # not using operator.contains because the it expects opposite argument order
-            "in_exact": self.inlist_exact,  # not using operator.contains because the it expects opposite argument order
-        }
+        self.predicates: tuple[tuple[str, Callable[[Any], bool]], ...] = tuple(
+            (column_filter.column, compile_filter(column_filter)) for column_filter in filters or ()
+        )
 
     def include_row(self, row: dict[str, Any]) -> bool:
         """
         :param row: A dictionary representing a single row
         :return: bool for whether the row should be included
         """
-
-        if not self.filters:
-            return True
-
-        for column_filter in self.filters:
-            row_value = row.get(column_filter.column)
+        for column, predicate in self.predicates:
+            row_value = row.get(column)
 
             # None can't be greater, less than or equal to any specified value, right?
-            if row_value is None:
-                return False
-
-            include = column_filter.inclusion == FilterInclusion("include")
-            exclude = column_filter.inclusion == FilterInclusion("exclude")
-
-            comparison_method = self.operators.get(column_filter.filter_code)
-            if comparison_method is None:
-                raise ValueError(f"No such operator for filter code `{column_filter.filter_code}`")
-
-            comparison_match = comparison_method(row_value, column_filter.value)
-
-            if (include and not comparison_match) or (exclude and comparison_match):
+            if row_value is None or not predicate(row_value):
                 return False
 
         return True
-
-    def inlist(self, column_value: Any, filter_values: list[str]):
-        # Check if the passed in column is exactly matched against
-        # For a filter_list of ['abc','def','ghi']; this will be true
-        # for column_value 'abc' but not 'abcde.'
-        if column_value in filter_values:
-            return True
-
-        if not isinstance(column_value, str):
-            return False
-
-        # The following iterates through all filters and will return true if
-        # the text of the  filter is found within the column_value.
-        # So for the above example this boolean will return True, because :'abc' in 'abcde': returns True.
-        for filter_value in filter_values:
-            if filter_value in column_value:
-                return True
-
-        return False
-
-    def inlist_exact(self, column_value, filter_values):
-        # Check if the passed in column is exactly matched against
-        # For a filter_list of ['abc','def','ghi']; this will be true
-        # for column_value 'abc' but not 'abcde.'
-        if column_value in filter_values:
-            return True
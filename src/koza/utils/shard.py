@@ -0,0 +1,51 @@
+import zlib
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class Shard:
+    """
+    Selects partition `index` of `count` disjoint partitions of a transform's input.
+
+    Assignment is deterministic, so separate machines running `koza transform --shard i/n`
+    for every `i` in `0..n-1` process each input exactly once without coordinating.
+    Either whole input files are assigned round-robin by their position in the
+    configured file list, or individual rows are assigned by a stable hash of a key
+    column (see `shard_key` in the reader configuration).
+    """
+
+    index: int
+    count: int
+
+    def __post_init__(self):
+        if self.count < 1:
+            raise ValueError(f"Shard count must be at least 1, got {self.count}")
+        if not 0 <= self.index < self.count:
+            raise ValueError(f"Shard index must be between 0 and {self.count - 1}, got {self.index}")
+
+    @classmethod
+    def parse(cls, value: str) -> "Shard":
+        """Parse a shard selector of the form `i/n`, e.g. `0/4`"""
+        try:
+            index, count = value.split("/")
+            return cls(int(index), int(count))
+        except ValueError as e:
+            raise ValueError(f"Invalid shard `{value}`, expected `i/n` (e.g. `0/4`): {e}") from e
+
+    @property
+    def name(self) -> str:
+        """The suffix used for this shard's output files, e.g. `shard-0`"""
+        return f"shard-{self.index}"
+
+    def includes_position(self, position: int) -> bool:
+        """Whether the input file at `position` belongs to this shard"""
+        return position % self.count == self.index
+
+    def includes_value(self, value: Any) -> bool:
+        """Whether a row whose key column holds `value` belongs to this shard.
+
+        Uses CRC32 of the value's string form, which (unlike `hash()`) is stable
+        across processes, machines and Python versions.
+        """
+        return zlib.crc32(str(value).encode("utf-8")) % self.count == self.index
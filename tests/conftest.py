@@ -7,3 +7,11 @@ def caplog(caplog):
     handler_id = logger.add(caplog.handler, format="{message}")
     yield caplog
     logger.remove(handler_id)
+
+
+@pytest.fixture(autouse=True)
+def download_cache(tmp_path_factory, monkeypatch):
+    """Keep files downloaded during tests out of the user's cache"""
+    cache_dir = tmp_path_factory.mktemp("download-cache")
+    monkeypatch.setenv("KOZA_CACHE_DIR", str(cache_dir))
+    return cache_dir
@@ -0,0 +1,66 @@
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from koza.io.reader.archive_reader import ArchiveReader
+from koza.model.reader import CSVReaderConfig, JSONLReaderConfig
+from koza.model.source import Source
+
+source_files = Path(__file__).parent.parent / "resources" / "source-files"
+
+
+def _write_archive(path: Path, members: dict[str, str]) -> Path:
+    if path.suffix == ".zip":
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zip_fh:
+            for name, content in members.items():
+                zip_fh.writestr(name, content)
+    else:
+        with tarfile.open(path, "w:gz") as tar_fh:
+            for name, content in members.items():
+                member = path.parent / name
+                member.write_text(content)
+                tar_fh.add(member, arcname=name)
+    return path
+
+
+def _members(count: int) -> dict[str, str]:
+    return {
+        f"chunk-{i}.jsonl": "".join(f'{{"id": "{i}-{j}", "score": {j % 5}}}\n' for j in range(200))
+        for i in range(count)
+    }
+
+
+@pytest.mark.parametrize("archive_name", ["members.zip", "members.tar.gz"])
+def test_archive_workers_match_serial(tmp_path, archive_name):
+    archive = _write_archive(tmp_path / archive_name, _members(6))
+    serial = list(Source(JSONLReaderConfig(file_archive=str(archive)), tmp_path))
+    parallel = Source(JSONLReaderConfig(file_archive=str(archive), archive_workers=3), tmp_path)
+
+    assert len(serial) == 1200
+    assert list(parallel) == serial
+    assert isinstance(parallel._readers[0], ArchiveReader)
+    assert parallel.resource_names == [f"chunk-{i}.jsonl" for i in range(6)]
+
+
+def test_archive_workers_unordered_with_filter(tmp_path):
+    archive = _write_archive(tmp_path / "members.zip", _members(6))
+    filters = [{"column": "score", "inclusion": "include", "filter_code": "eq", "value": 0}]
+    config = JSONLReaderConfig(files=[str(archive)], filters=filters, archive_workers=3, preserve_order=False)
+
+    rows = list(Source(config, tmp_path))
+
+    assert sorted(row["id"] for row in rows) == sorted(f"{i}-{j}" for i in range(6) for j in range(0, 200, 5))
+
+
+def test_archive_workers_with_selected_files_and_row_limit():
+    config = CSVReaderConfig(
+        file_archive=str(source_files / "string-split.zip"),
+        files=["string-b.tsv"],
+        delimiter=" ",
+        archive_workers=2,
+    )
+
+    assert len(list(Source(config, source_files))) == 10
+    assert len(list(Source(config, source_files, row_limit=3))) == 3
@@ -0,0 +1,56 @@
+import pytest
+
+from koza.model.reader import ArrowReaderConfig, ParquetReaderConfig
+from koza.model.source import Source
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+feather = pytest.importorskip("pyarrow.feather")
+
+ROWS = [
+    {"id": "A:1", "name": "alpha", "score": 1.5, "count": 3, "tags": ["x", "y"]},
+    {"id": "A:2", "name": "beta", "score": 0.5, "count": None, "tags": []},
+    {"id": "B:3", "name": "alphabet", "score": 2.5, "count": 7, "tags": ["z"]},
+]
+
+
+@pytest.fixture(params=["parquet", "arrow"])
+def table_file(request, tmp_path):
+    table = pa.Table.from_pylist(ROWS)
+    if request.param == "parquet":
+        path = tmp_path / "rows.parquet"
+        pq.write_table(table, path, row_group_size=1)
+        return path, ParquetReaderConfig
+    path = tmp_path / "rows.arrow"
+    feather.write_feather(table, path)
+    return path, ArrowReaderConfig
+
+
+def test_reads_typed_rows(table_file, tmp_path):
+    path, config_class = table_file
+
+    assert list(Source(config_class(files=[str(path)]), tmp_path)) == ROWS
+
+
+def test_column_projection(table_file, tmp_path):
+    path, config_class = table_file
+    source = Source(config_class(files=[str(path)], columns=["id", "count"]), tmp_path)
+
+    assert list(source) == [{"id": row["id"], "count": row["count"]} for row in ROWS]
+
+
+@pytest.mark.parametrize(
+    "column_filter, expected",
+    [
+        ({"column": "score", "inclusion": "include", "filter_code": "gt", "value": 1}, ["A:1", "B:3"]),
+        ({"column": "count", "inclusion": "exclude", "filter_code": "eq", "value": 3}, ["B:3"]),
+        ({"column": "name", "inclusion": "include", "filter_code": "in", "value": ["alpha"]}, ["A:1", "B:3"]),
+        ({"column": "name", "inclusion": "include", "filter_code": "in_exact", "value": ["alpha"]}, ["A:1"]),
+        ({"column": "missing", "inclusion": "include", "filter_code": "ne", "value": 1}, []),
+    ],
+)
+def test_filters_match_row_filter(table_file, tmp_path, column_filter, expected):
+    path, config_class = table_file
+    config = config_class(files=[str(path)], columns=["id"], filters=[column_filter])
+
+    assert [row["id"] for row in Source(config, tmp_path)] == expected
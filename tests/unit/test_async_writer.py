@@ -0,0 +1,126 @@
+"""Tests for the background-thread writer wrapper."""
+
+import threading
+from pathlib import Path
+
+import pytest
+from biolink_model.datamodel.pydanticmodel_v2 import Gene, PairwiseGeneToGeneInteraction
+from pydantic import TypeAdapter
+
+from koza.io.writer.async_writer import AsyncWriter
+from koza.io.writer.jsonl_writer import JSONLWriter
+from koza.io.writer.passthrough_writer import PassthroughWriter
+from koza.io.writer.tsv_writer import TSVWriter
+from koza.model.koza import KozaConfig
+from koza.model.writer import WriterConfig
+from koza.runner import KozaRunner
+from koza.utils.exceptions import CountValidationError
+
+
+def _entities(n: int):
+    for i in range(n):
+        yield Gene(id=f"HGNC:{i}")
+        yield PairwiseGeneToGeneInteraction(
+            id=f"uuid:{i}",
+            subject=f"HGNC:{i}",
+            object=f"HGNC:{i + 1}",
+            predicate="biolink:interacts_with",
+            knowledge_level="not_provided",
+            agent_type="not_provided",
+        )
+
+
+def test_writes_through_background_thread(tmp_path):
+    inner = JSONLWriter(str(tmp_path), "async", WriterConfig())
+    writer = AsyncWriter(inner, queue_size=2)
+
+    # Small writes (as made by `koza.write`) as well as bulk ones
+    for entity in _entities(10):
+        writer.write([entity])
+    writer.write(_entities(2500))
+    writer.write_nodes([Gene(id="HGNC:extra")])
+    writer.finalize()
+
+    assert writer.node_count == 2501
+    assert writer.edge_count == 2510
+    with open(tmp_path / "async_edges.jsonl") as fh:
+        assert len(fh.readlines()) == 2510
+
+
+def test_preserves_write_order():
+    writer = AsyncWriter(PassthroughWriter(), queue_size=1)
+    writer.write(["a", "b"])
+    writer.write_nodes(["c"])
+    writer.write(["d"])
+    writer.write_edges(["e"])
+    writer.finalize()
+
+    assert writer.result() == ["a", "b", "c", "d", "e"]
+
+
+def test_counts_are_validated(tmp_path):
+    config = WriterConfig(node_properties=["id"], edge_properties=["id"], min_edge_count=100)
+    writer = AsyncWriter(TSVWriter(tmp_path, "async", config))
+    writer.write(_entities(5))
+    writer.finalize()
+
+    with pytest.raises(CountValidationError, match="edge count 5 is below the configured min_edge_count of 100"):
+        writer.validate_counts()
+
+
+class FailingWriter(PassthroughWriter):
+    def write(self, entities):
+        raise OSError("disk full")
+
+
+def test_errors_are_raised_in_caller():
+    writer = AsyncWriter(FailingWriter(), queue_size=1)
+
+    # The failure surfaces on a later write once the thread has hit it, and at the latest on finalize
+    with pytest.raises(OSError, match="disk full"):
+        for _ in range(100):
+            writer.write(range(1000))
+        writer.finalize()
+
+
+class BlockingWriter(PassthroughWriter):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, entities):
+        self.release.wait()
+        super().write(entities)
+
+
+def test_bounded_queue_applies_backpressure():
+    inner = BlockingWriter()
+    writer = AsyncWriter(inner, queue_size=1)
+
+    producer = threading.Thread(target=lambda: [writer.write(range(1000)) for _ in range(5)])
+    producer.start()
+    producer.join(timeout=0.5)
+    # One batch is being written, one is queued, and the producer is blocked on the third
+    assert producer.is_alive()
+
+    inner.release.set()
+    producer.join()
+    writer.finalize()
+    assert len(writer.result()) == 5000
+
+
+def test_runner_wraps_writer_when_configured(tmp_path):
+    config = TypeAdapter(KozaConfig).validate_python(
+        {
+            "name": "async",
+            "reader": {"format": "csv", "files": []},
+            "transform": {"code": "examples/minimal.py"},
+            "writer": {"format": "jsonl", "async_queue_size": 8},
+        }
+    )
+    root_dir = Path(__file__).parent.parent.parent
+    runner = KozaRunner.from_config(config, base_directory=root_dir, output_dir=str(tmp_path))
+
+    assert isinstance(runner.writer, AsyncWriter)
+    assert isinstance(runner.writer.writer, JSONLWriter)
+    runner.writer.finalize()
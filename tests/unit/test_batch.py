@@ -0,0 +1,87 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from koza import batch
+from koza.batch import IngestResult, expand_config_patterns, format_summary, run_ingests
+from koza.main import typer_app
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+STRING_CONFIG = str(ROOT_DIR / "examples/string/protein-links-detailed.yaml")
+YIELD_CONFIG = str(ROOT_DIR / "examples/string-yield/protein-links-yield.yaml")
+
+
+def test_expand_config_patterns():
+    configs = expand_config_patterns([str(ROOT_DIR / "examples/string*/protein-links-*.yaml"), STRING_CONFIG])
+    assert configs == [
+        str(ROOT_DIR / "examples/string-file-archive/protein-links-file-archive.yaml"),
+        str(ROOT_DIR / "examples/string-w-state/protein-links-detailed.yaml"),
+        str(ROOT_DIR / "examples/string-yield/protein-links-yield.yaml"),
+        STRING_CONFIG,
+    ]
+    assert expand_config_patterns(["missing.yaml"]) == ["missing.yaml"]
+
+
+def test_run_ingests(tmp_path):
+    results = run_ingests(
+        [STRING_CONFIG, "missing.yaml", YIELD_CONFIG],
+        output_dir=str(tmp_path),
+        concurrency=2,
+        log_level=None,
+    )
+
+    assert [result.config for result in results] == [STRING_CONFIG, "missing.yaml", YIELD_CONFIG]
+    assert [result.ok for result in results] == [True, False, True]
+    assert "missing.yaml" in results[1].error
+    assert results[0].name == "protein-links-detailed"
+    assert results[0].rows > 0
+    assert results[0].edge_count > 0
+    assert (tmp_path / "protein-links-detailed_edges.tsv").exists()
+    assert (tmp_path / "protein-links-yield_edges.tsv").exists()
+
+
+def test_format_summary():
+    summary = format_summary(
+        [
+            IngestResult(config="a.yaml", rows=10, node_count=4, edge_count=2, seconds=1.5),
+            IngestResult(config="b.yaml", error="boom"),
+        ]
+    )
+    lines = summary.splitlines()
+    assert lines[0].split() == ["config", "status", "rows", "nodes", "edges", "seconds"]
+    assert lines[1].split() == ["a.yaml", "ok", "10", "4", "2", "1.50"]
+    assert lines[2].split() == ["b.yaml", "FAILED", "0", "0", "0", "0.00"]
+    assert lines[3].split() == ["total", "1", "failed", "10", "4", "2", "1.50"]
+
+
+def test_transform_all_cli(tmp_path):
+    summary = tmp_path / "summary.json"
+    result = CliRunner().invoke(
+        typer_app,
+        ["transform-all", STRING_CONFIG, "-o", str(tmp_path), "-q", "--summary", str(summary)],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert STRING_CONFIG in result.output
+    assert json.loads(summary.read_text())[0]["error"] is None
+
+    result = CliRunner().invoke(typer_app, ["transform-all", "missing.yaml", "-o", str(tmp_path), "-q"])
+    assert result.exit_code == 1
+
+
+def test_run_ingests_rejects_duplicate_names(tmp_path):
+    results = run_ingests([STRING_CONFIG, STRING_CONFIG], output_dir=str(tmp_path), log_level=None)
+
+    assert [result.ok for result in results] == [True, False]
+    assert "same name, `protein-links-detailed`" in results[1].error
+
+
+def test_run_ingests_without_replacing_pool_workers(tmp_path, monkeypatch):
+    # Before python 3.11, each ingest gets a process of its own instead of a single-use pool worker
+    monkeypatch.setattr(batch, "POOL_REPLACES_WORKERS", False)
+
+    results = run_ingests([STRING_CONFIG, "missing.yaml"], output_dir=str(tmp_path), concurrency=2, log_level=None)
+
+    assert [result.ok for result in results] == [True, False]
+    assert (tmp_path / "protein-links-detailed_edges.tsv").exists()
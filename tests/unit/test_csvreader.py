@@ -1,9 +1,11 @@
+import pickle
 from io import StringIO
 from pathlib import Path
 
 import pytest
 
-from koza.io.reader.csv_reader import CSVReader
+from koza.io.reader.csv_reader import CSVReader, make_row_decoder
+from koza.io.row import Row
 from koza.model.formats import InputFormat
 from koza.model.reader import CSVReaderConfig, FieldType
 
@@ -206,3 +208,115 @@ def test_header_with_blank_lines():
     )
     reader = CSVReader(test_buffer, config)
     assert reader.header == ["a", "b", "c"]
+
+
+def test_mmap_matches_text_stream():
+    config = CSVReaderConfig(field_type_map=field_type_map, delimiter=" ")
+    with open(test_file) as string_file:
+        expected = list(CSVReader(string_file, config))
+
+    with open(test_file) as string_file:
+        reader = CSVReader(string_file, config, raw=string_file.buffer)
+        assert reader.header == list(field_type_map)
+        assert list(reader) == expected
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_header_delimiter_from_file(tmp_path, mmap):
+    path = tmp_path / "data.csv"
+    path.write_text("# comment\na/b/c\n1,2,3\n4,5,6\n")
+    config = CSVReaderConfig(delimiter=",", header_delimiter="/", mmap=mmap)
+
+    with open(path) as fh:
+        reader = CSVReader(fh, config, raw=fh.buffer if mmap else None)
+        assert reader.header == ["a", "b", "c"]
+        assert reader.header_line_count == 2
+        assert list(reader) == [{"a": "1", "b": "2", "c": "3"}, {"a": "4", "b": "5", "c": "6"}]
+
+
+def _named_io(text: str) -> StringIO:
+    data = StringIO(text)
+    data.name = "data.tsv"
+    return data
+
+
+def test_filters_applied_before_conversion():
+    data = _named_io("id\ttaxon\tscore\n1\tNCBITaxon:9606\t3\n2\tNCBITaxon:10090\tnot a number\n3\tNCBITaxon:9606\t5\n")
+    config = CSVReaderConfig(
+        columns=["id", "taxon", {"score": FieldType.int}],
+        filters=[{"column": "taxon", "inclusion": "include", "filter_code": "in_exact", "value": ["NCBITaxon:9606"]}],
+    )
+    reader = CSVReader(data, config)
+
+    # The row that is filtered out is never converted, so its score doesn't raise
+    assert list(reader) == [
+        {"id": "1", "taxon": "NCBITaxon:9606", "score": 3},
+        {"id": "3", "taxon": "NCBITaxon:9606", "score": 5},
+    ]
+
+
+def test_filters_compare_converted_values():
+    data = _named_io("id\tscore\n1\t3\n2\t10\n3\t25\n")
+    config = CSVReaderConfig(
+        field_type_map={"id": FieldType.str, "score": FieldType.int},
+        filters=[{"column": "score", "inclusion": "include", "filter_code": "gt", "value": 5}],
+    )
+    assert [row["id"] for row in CSVReader(data, config)] == ["2", "3"]
+
+    data = _named_io("id\tscore\n1\t3\n")
+    config = CSVReaderConfig(filters=[{"column": "missing", "inclusion": "exclude", "filter_code": "eq", "value": 1}])
+    assert list(CSVReader(data, config)) == []
+
+
+def test_row_decoder():
+    header = ["id", "count", "score", 'it\'s "quoted"\n', "id"]
+    decode_row = make_row_decoder(header, [str, int, float, str.upper, str])
+
+    assert decode_row([" a ", " 3 ", "0.5\t", " b ", "c"]) == {
+        "id": "c",
+        "count": 3,
+        "score": 0.5,
+        'it\'s "quoted"\n': "B",
+    }
+    with pytest.raises(ValueError):
+        decode_row(["a", "", "0.5", "b", "c"])
+
+
+def test_select_columns():
+    config = CSVReaderConfig(
+        field_type_map=field_type_map, delimiter=" ", select_columns=["combined_score", "protein1"]
+    )
+    with open(test_file) as string_file:
+        row = next(iter(CSVReader(string_file, config)))
+    assert list(row) == ["combined_score", "protein1"]
+    assert isinstance(row["combined_score"], int)
+
+    config = CSVReaderConfig(delimiter=" ", select_columns=["protein1", "not_a_column"])
+    with open(test_file) as string_file, pytest.raises(ValueError, match="not_a_column"):
+        next(iter(CSVReader(string_file, config)))
+
+    with pytest.raises(ValueError, match="not_a_column"):
+        CSVReaderConfig(columns=["protein1"], select_columns=["not_a_column"])
+
+
+def test_compact_rows():
+    with open(test_file) as string_file:
+        rows = list(CSVReader(string_file, CSVReaderConfig(field_type_map=field_type_map, delimiter=" ")))
+    with open(test_file) as string_file:
+        config = CSVReaderConfig(field_type_map=field_type_map, delimiter=" ", compact_rows=True)
+        compact_rows = list(CSVReader(string_file, config))
+
+    assert compact_rows == rows
+    row = compact_rows[0]
+    assert isinstance(row, Row)
+    assert row["combined_score"] == rows[0]["combined_score"]
+    assert row.get("not_a_column", "default") == "default"
+    assert "protein1" in row and "not_a_column" not in row
+    assert list(row) == list(rows[0])
+    with pytest.raises(TypeError):
+        row["protein1"] = "changed"  # type: ignore[index]
+
+    # Rows share their index, including after being pickled together
+    unpickled = pickle.loads(pickle.dumps(compact_rows))  # noqa: S301
+    assert unpickled == rows
+    assert unpickled[0]._index is unpickled[1]._index
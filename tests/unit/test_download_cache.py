@@ -0,0 +1,118 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from koza.io.download_cache import download, evict
+from koza.io.utils import open_resource
+
+
+class FileServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FileHandler)
+        self.files: dict[str, bytes] = {}
+        self.etags: dict[str, str] = {}
+        self.requests: list[tuple[str, int]] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    server: FileServer
+
+    def do_GET(self):
+        if self.path not in self.server.files:
+            status = 404
+            body = b"Not Found"
+        elif self.headers.get("If-None-Match") == self.server.etags[self.path]:
+            status = 304
+            body = b""
+        else:
+            status = 200
+            body = self.server.files[self.path]
+
+        self.server.requests.append((self.path, status))
+        self.send_response(status)
+        if status != 404:
+            self.send_header("ETag", self.server.etags[self.path])
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FileServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def serve(server: FileServer, path: str, content: bytes, etag: str):
+    server.files[path] = content
+    server.etags[path] = f'"{etag}"'
+
+
+def test_download_is_cached_and_revalidated(server, download_cache):
+    serve(server, "/data.tsv", b"a\tb\n1\t2\n", "v1")
+
+    path = download(f"{server.url}/data.tsv")
+    assert path.parent == download_cache
+    assert path.read_bytes() == b"a\tb\n1\t2\n"
+
+    assert download(f"{server.url}/data.tsv") == path
+    assert server.requests == [("/data.tsv", 200), ("/data.tsv", 304)]
+
+    serve(server, "/data.tsv", b"a\tb\n3\t4\n", "v2")
+    assert download(f"{server.url}/data.tsv").read_bytes() == b"a\tb\n3\t4\n"
+
+
+def test_cached_copy_is_used_when_offline(server, tmp_path):
+    serve(server, "/data.tsv", b"a\tb\n", "v1")
+    url = f"{server.url}/data.tsv"
+    path = download(url, cache_dir=tmp_path)
+
+    server.shutdown()
+    server.server_close()
+
+    assert download(url, cache_dir=tmp_path) == path
+
+
+def test_missing_remote_file(server):
+    with pytest.raises(ValueError, match="Remote file returned 404"):
+        download(f"{server.url}/missing.tsv")
+
+
+def test_evicts_least_recently_used(server, tmp_path):
+    for name in ["a", "b", "c"]:
+        serve(server, f"/{name}", name.encode() * 100, name)
+
+    a = download(f"{server.url}/a", cache_dir=tmp_path, max_size=250)
+    b = download(f"{server.url}/b", cache_dir=tmp_path, max_size=250)
+    # Using a marks it as more recently used than b
+    download(f"{server.url}/a", cache_dir=tmp_path, max_size=250)
+    c = download(f"{server.url}/c", cache_dir=tmp_path, max_size=250)
+
+    assert a.exists() and c.exists()
+    assert not b.exists() and not b.with_suffix(".json").exists()
+
+    evict(tmp_path, max_size=0)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_open_remote_resource(server):
+    serve(server, "/string.tsv", b"protein1 protein2\nA B\n", "v1")
+
+    resource = open_resource(f"{server.url}/string.tsv")
+
+    assert not isinstance(resource, tuple)
+    assert resource.name == f"{server.url}/string.tsv"
+    assert resource.reader.read() == "protein1 protein2\nA B\n"
+    resource.reader.close()
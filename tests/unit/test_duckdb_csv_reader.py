@@ -0,0 +1,173 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from koza.io.reader.csv_reader import CSVReader
+from koza.io.reader.duckdb_csv_reader import DuckDBCSVReader
+from koza.io.row import Row
+from koza.io.utils import open_resource
+from koza.model.reader import CSVReaderConfig, FieldType
+from koza.model.source import Source
+
+test_file = Path(__file__).parent.parent / "resources" / "source-files" / "string.tsv"
+
+field_type_map = {
+    "protein1": FieldType.str,
+    "protein2": FieldType.str,
+    "neighborhood": FieldType.str,
+    "fusion": FieldType.str,
+    "cooccurence": FieldType.str,
+    "coexpression": FieldType.str,
+    "experimental": FieldType.str,
+    "database": FieldType.str,
+    "textmining": FieldType.float,
+    "combined_score": FieldType.int,
+}
+
+
+def _python_rows(path: Path, config: CSVReaderConfig):
+    with open(path) as fh:
+        return list(CSVReader(fh, config))
+
+
+def _duckdb_rows(path: Path, config: CSVReaderConfig):
+    resource = open_resource(path)
+    assert not isinstance(resource, tuple)
+    try:
+        return list(DuckDBCSVReader(resource, config))
+    finally:
+        resource.reader.close()
+
+
+def test_matches_python_reader():
+    config = CSVReaderConfig(field_type_map=field_type_map, delimiter=" ")
+
+    rows = _duckdb_rows(test_file, config)
+
+    assert rows == _python_rows(test_file, config)
+    assert isinstance(rows[0]["combined_score"], int)
+    assert isinstance(rows[0]["textmining"], float)
+
+
+def test_header_comments_blank_lines_and_padding(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text('# preamble\n\nid\tname\tscore\n# a comment\n a \tx y\t7\n\nb\t\t5\nc\t"q,\tz"\t12\nd\te\n')
+    config = CSVReaderConfig(columns=["id", "name", {"score": "int"}])
+
+    rows = _duckdb_rows(path, config)
+
+    assert rows == [
+        {"id": "a", "name": "x y", "score": 7},
+        {"id": "b", "name": "", "score": 5},
+        {"id": "c", "name": "q,\tz", "score": 12},
+        {"id": "d", "name": "e", "score": None},
+    ]
+
+
+def test_header_mode_none_and_gzip(tmp_path):
+    path = tmp_path / "data.tsv.gz"
+    with gzip.open(path, "wt") as fh:
+        fh.write("1\tone\n2\ttwo\n")
+    config = CSVReaderConfig(header_mode="none", columns=[{"n": "int"}, "name"])
+
+    assert _duckdb_rows(path, config) == [{"n": 1, "name": "one"}, {"n": 2, "name": "two"}]
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        [{"column": "combined_score", "inclusion": "include", "filter_code": "lt", "value": 700}],
+        [{"column": "combined_score", "inclusion": "exclude", "filter_code": "ge", "value": 500}],
+        [{"column": "textmining", "inclusion": "include", "filter_code": "eq", "value": 67.0}],
+        [{"column": "protein2", "inclusion": "include", "filter_code": "ne", "value": "10090.ENSMUSP00000020316"}],
+        [{"column": "protein2", "inclusion": "include", "filter_code": "in", "value": ["0002", "ENSMUSP00000090329"]}],
+        [{"column": "protein2", "inclusion": "exclude", "filter_code": "in", "value": ["0002"]}],
+        [{"column": "protein2", "inclusion": "include", "filter_code": "in_exact", "value": ["0002"]}],
+        [{"column": "combined_score", "inclusion": "include", "filter_code": "in_exact", "value": [192, 196]}],
+        [
+            {"column": "combined_score", "inclusion": "include", "filter_code": "gt", "value": 190},
+            {"column": "experimental", "inclusion": "exclude", "filter_code": "eq", "value": "0"},
+        ],
+    ],
+)
+def test_filters_match_row_filter(filters):
+    reader_config = {"files": [str(test_file)], "delimiter": " ", "field_type_map": field_type_map}
+    config = CSVReaderConfig(**reader_config, filters=filters)
+    duckdb_config = CSVReaderConfig(**reader_config, filters=filters, engine="duckdb")
+
+    expected = list(Source(config, test_file.parent))
+    rows = list(Source(duckdb_config, test_file.parent))
+
+    assert rows == expected
+
+
+def test_filter_on_missing_column_matches_nothing(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text("a\tb\n1\t2\n")
+    config = CSVReaderConfig(
+        columns=["a", "b"],
+        filters=[{"column": "a", "inclusion": "include", "filter_code": "eq", "value": "1"}],
+    )
+    resource = open_resource(path)
+    assert not isinstance(resource, tuple)
+
+    reader = DuckDBCSVReader(resource, config)
+    assert list(reader) == [{"a": "1", "b": "2"}]
+
+    sql, params = DuckDBCSVReader._filter_sql(config.filters[0], ["b"], {})
+    assert (sql, params) == ("false", [])
+
+
+def test_remote_resources_are_rejected():
+    config = CSVReaderConfig()
+    resource = open_resource(test_file)
+    assert not isinstance(resource, tuple)
+    resource.path = None
+
+    with pytest.raises(ValueError, match="only local files"):
+        DuckDBCSVReader(resource, config)
+
+
+def test_source_falls_back_to_python_for_archives():
+    archive = Path(__file__).parent.parent / "resources" / "source-files" / "string-split.zip"
+    reader_config = {"files": [str(archive)], "delimiter": " ", "field_type_map": field_type_map}
+    source = Source(CSVReaderConfig(**reader_config, engine="duckdb"), Path.cwd())
+
+    rows = list(source)
+
+    assert not any(isinstance(reader, DuckDBCSVReader) for reader in source._readers)
+    assert rows == list(Source(CSVReaderConfig(**reader_config), Path.cwd()))
+
+
+def test_header_delimiter(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text("a|b\n1\t2\n")
+    config = CSVReaderConfig(header_delimiter="|")
+
+    assert _duckdb_rows(path, config) == [{"a": "1", "b": "2"}]
+
+
+def test_select_columns_matches_python(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text("a\tb\tc\td\n1\t2\t3\t4\n5\t6\t7\t8\n")
+    config = CSVReaderConfig(
+        field_type_map={"a": FieldType.int, "b": FieldType.str, "c": FieldType.int, "d": FieldType.str},
+        select_columns=["d", "a"],
+        filters=[{"column": "c", "inclusion": "include", "filter_code": "gt", "value": 3}],
+    )
+
+    expected = [{"d": "8", "a": 5}]
+    assert _python_rows(path, config) == expected
+    assert _duckdb_rows(path, config) == expected
+
+
+def test_compact_rows(tmp_path):
+    path = tmp_path / "data.tsv"
+    path.write_text("a\tb\n1\t2\n3\t4\n")
+    config = CSVReaderConfig(field_type_map={"a": FieldType.int, "b": FieldType.str}, compact_rows=True)
+
+    rows = _duckdb_rows(path, config)
+
+    assert rows == [{"a": 1, "b": "2"}, {"a": 3, "b": "4"}]
+    assert all(isinstance(row, Row) for row in rows)
@@ -148,3 +148,35 @@ def test_empty_filters():
     rf = RowFilter()
 
     assert rf.include_row(row)
+
+
+@pytest.mark.parametrize(
+    "code, value, row_value, result",
+    [
+        ("in", ["NCBITaxon:9606", "NCBITaxon:10090"], "NCBITaxon:9606", True),
+        ("in", ["NCBITaxon:9606", "NCBITaxon:10090"], "NCBITaxon:96", False),
+        # `in` also matches values that contain a filter value
+        ("in", ["NCBITaxon:9606", "NCBITaxon:10090"], "taxon NCBITaxon:10090 (mouse)", True),
+        ("in", ["", "alpaca"], "llama", True),
+        ("in", [1, "1"], 1.0, True),
+        ("in", [2, "a"], ["a"], False),
+        ("in_exact", ["NCBITaxon:9606", "NCBITaxon:10090"], "NCBITaxon:9606", True),
+        ("in_exact", ["NCBITaxon:9606", "NCBITaxon:10090"], "taxon NCBITaxon:10090 (mouse)", False),
+    ],
+)
+def test_inlist_filter(code, value, row_value, result):
+    column_filter = get_filter(column="c", inclusion="include", filter_code=code, value=value)
+    assert RowFilter([column_filter]).include_row({"c": row_value}) is result
+
+    column_filter = get_filter(column="c", inclusion="exclude", filter_code=code, value=value)
+    assert RowFilter([column_filter]).include_row({"c": row_value}) is not result
+
+
+def test_large_inlist_filter():
+    taxa = [f"NCBITaxon:{i}" for i in range(10_000)]
+    rf = RowFilter([get_filter(column="c", inclusion="include", filter_code="in", value=taxa)])
+
+    assert rf.include_row({"c": "NCBITaxon:9999"})
+    assert rf.include_row({"c": "NCBITaxon:123456"})
+    assert not rf.include_row({"c": "UniProtKB:P12345"})
+    assert not rf.include_row({"d": "NCBITaxon:1"})
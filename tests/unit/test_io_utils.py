@@ -9,6 +9,9 @@ https://github.com/monarch-initiative/dipper/blob/6f1fe5bb/dipper/utils/TestUtil
 https://github.com/monarch-initiative/dipper/blob/682560f/tests/test_udp.py#L85
 """
 
+import dataclasses
+import io
+import tarfile
 from pathlib import Path
 from tarfile import TarFile
 from unittest.mock import MagicMock, patch
@@ -18,6 +21,8 @@ import pytest
 
 from koza.io import utils as io_utils
 from koza.io.utils import _sanitize_export_property
+from koza.model.reader import CSVReaderConfig, JSONLReaderConfig
+from koza.model.source import Source
 
 
 def test_404():
@@ -27,7 +32,7 @@ def test_404():
     mock_response.status_code = 404
     mock_response.text = "Not Found"
 
-    with patch("koza.io.utils.requests.get", return_value=mock_response):
+    with patch("koza.io.download_cache.requests.get", return_value=mock_response):
         with pytest.raises(ValueError, match="Remote file returned 404"):
             io_utils.open_resource("http://example.com/nonexistent")
 
@@ -85,6 +90,84 @@ def test_open_tarfile():
     tar_fh.close()
 
 
+def test_open_tarfile_stream():
+    resource = io_utils.open_resource("tests/resources/source-files/string-split.tar.gz", stream=True)
+    assert isinstance(resource, tuple)
+    tar_fh, resources = resource
+
+    resource_1 = next(resources)
+    assert resource_1.name == "string-a.tsv"
+    assert not resource_1.reader.seekable()
+    contents = list(resource_1.reader)
+    assert len(contents) == 9
+    assert resource_1.tell() == resource_1.size
+    # Members are only decompressed once, so they can't be rewound
+    with pytest.raises(io.UnsupportedOperation):
+        resource_1.reader.seek(0)
+
+    resource_2 = next(resources)
+    assert resource_2.name == "string-b.tsv"
+    assert len(list(resource_2.reader)) == 11
+    assert next(resources, None) is None
+
+    tar_fh.close()
+
+
+def _write_tar(path: Path, tar_format: int | None, member: str, data: bytes):
+    """Write a one member tar, as an old V7 tar (without a "ustar" magic string) when `tar_format` is None"""
+    info = tarfile.TarInfo(member)
+    info.size = len(data)
+    header = bytearray(info.tobuf(tar_format or tarfile.USTAR_FORMAT))
+    if tar_format is None:
+        header[257:265] = bytes(8)
+        header[148:156] = b" " * 8
+        header[148:156] = b"%06o\0 " % sum(header)
+    padding = bytes(-len(data) % tarfile.BLOCKSIZE + 2 * tarfile.BLOCKSIZE)
+    path.write_bytes(bytes(header) + data + padding)
+
+
+@pytest.mark.parametrize("tar_format", [tarfile.GNU_FORMAT, None], ids=["gnu", "v7"])
+@pytest.mark.parametrize("stream", [False, True])
+def test_open_tarfile_without_ustar_magic(tmp_path, tar_format, stream):
+    tar_path = tmp_path / "old.tar"
+    _write_tar(tar_path, tar_format, "rows.tsv", b"a\tb\n1\t2\n")
+    if tar_format is None:
+        assert io_utils.is_tar_header(tar_path.read_bytes())
+        assert tar_path.read_bytes()[257:262] != b"ustar"
+
+    resource = io_utils.open_resource(tar_path, stream=stream)
+    assert isinstance(resource, tuple)
+    tar_fh, resources = resource
+    assert isinstance(tar_fh, TarFile)
+    member = next(resources)
+    assert member.name == "rows.tsv"
+    assert list(member.reader) == ["a\tb\n", "1\t2\n"]
+    tar_fh.close()
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("data.zip", True),
+        ("data.tar", True),
+        ("data.TAR.GZ", True),
+        ("data.tar.zst", True),
+        ("data.tgz", True),
+        ("data.tsv.gz", False),
+        ("data.tsv", False),
+        ("https://example.org/v1.2/data.tsv", False),
+        ("data", False),
+    ],
+)
+def test_is_archive_name(name, expected):
+    assert io_utils.is_archive_name(name) == expected
+
+
+def test_is_tar_header_rejects_text():
+    assert not io_utils.is_tar_header(b"id\tname\n" * 100)
+    assert not io_utils.is_tar_header(bytes(tarfile.BLOCKSIZE))
+
+
 def test_open_gzip():
     resource = io_utils.open_resource("tests/resources/source-files/ZFIN_PHENOTYPE_0.jsonl.gz")
     assert not isinstance(resource, tuple)
@@ -94,6 +177,118 @@ def test_open_gzip():
     resource.reader.close()
 
 
+def _zstd_module():
+    try:
+        from compression import zstd
+    except ImportError:
+        zstd = pytest.importorskip("backports.zstd")
+    return zstd
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz", "zstd"])
+def test_open_compressed(tmp_path, compression):
+    open_compressed = io_utils.DECOMPRESSORS[compression]
+    if compression == "zstd":
+        open_compressed = _zstd_module().open
+    path = tmp_path / "string.tsv.compressed"
+    with open("tests/resources/source-files/string.tsv", "rb") as fh, open_compressed(path, "wb") as out:
+        out.write(fh.read())
+
+    resource = io_utils.open_resource(path)
+    assert not isinstance(resource, tuple)
+    assert resource.compression == compression
+    contents = check_resource_completion(resource)
+    assert len(contents) == 19
+
+    resource.reader.close()
+
+
+@pytest.mark.parametrize("compression", ["gzip", "bz2", "xz", "zstd"])
+@pytest.mark.parametrize(
+    "source_file, config, row_count",
+    [
+        ("string.tsv", CSVReaderConfig(delimiter=" "), 18),
+        ("ZFIN_PHENOTYPE_0.jsonl.gz", JSONLReaderConfig(), 10),
+    ],
+)
+def test_read_compressed_source(tmp_path, compression, source_file, config, row_count):
+    open_compressed = io_utils.DECOMPRESSORS[compression]
+    if compression == "zstd":
+        open_compressed = _zstd_module().open
+    resource = io_utils.open_resource(Path("tests/resources/source-files") / source_file)
+    assert not isinstance(resource, tuple)
+    with resource.reader as reader:
+        data = reader.read()
+    path = tmp_path / "source.compressed"
+    with open_compressed(path, "wt") as out:
+        out.write(data)
+
+    # Readers use their input's name in messages, including after the last row
+    rows = list(Source(dataclasses.replace(config, files=[str(path)]), tmp_path))
+
+    assert len(rows) == row_count
+
+
+def test_open_zstd_tarfile(tmp_path):
+    path = tmp_path / "string-split.tar.zst"
+    with tarfile.open("tests/resources/source-files/string-split.tar.gz") as tar_gz:
+        with _zstd_module().open(path, "wb") as out:
+            with tarfile.open(fileobj=out, mode="w") as tar_zst:
+                for member in tar_gz:
+                    tar_zst.addfile(member, tar_gz.extractfile(member))
+
+    resource = io_utils.open_resource(path)
+    assert isinstance(resource, tuple)
+    tar_fh, resources = resource
+    assert [len(list(r.reader)) for r in resources] == [9, 11]
+
+    tar_fh.close()
+
+
+def test_fast_gzip_backend():
+    igzip = pytest.importorskip("isal.igzip")
+    assert io_utils.GZIP_BACKEND == "isal"
+    assert io_utils.DECOMPRESSORS["gzip"] is igzip.open
+
+
+def test_mmap_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(io_utils, "MMAP_BATCH_SIZE", 4)
+    path = tmp_path / "lines.txt"
+    path.write_bytes(b"a\nbb\r\nccc\nlast")
+
+    with path.open("rb") as raw:
+        assert list(io_utils.mmap_lines(raw)) == [b"a\n", b"bb\r\n", b"ccc\n", b"last"]
+        assert raw.tell() == path.stat().st_size
+        assert list(io_utils.mmap_lines(raw, start=2, end=10)) == [b"bb\r\n", b"ccc\n"]
+
+    (tmp_path / "empty.txt").touch()
+    with (tmp_path / "empty.txt").open("rb") as raw:
+        assert list(io_utils.mmap_lines(raw)) == []
+
+
+def test_sniff_compression():
+    assert io_utils.sniff_compression(b"\x1f\x8b\x08") == "gzip"
+    assert io_utils.sniff_compression(b"PK\x03\x04") == "zip"
+    assert io_utils.sniff_compression(b"id\tname\n") is None
+
+
+def test_open_plain_file_exposes_raw_handle():
+    resource = io_utils.open_resource("tests/resources/source-files/string.tsv")
+    assert not isinstance(resource, tuple)
+    assert resource.raw is not None and resource.raw.seekable()
+    resource.raw.seek(0)
+    with open("tests/resources/source-files/string.tsv", "rb") as fh:
+        assert resource.raw.readline() == fh.readline()
+    resource.reader.close()
+
+
+def test_open_gzip_has_no_raw_handle():
+    resource = io_utils.open_resource("tests/resources/source-files/ZFIN_PHENOTYPE_0.jsonl.gz")
+    assert not isinstance(resource, tuple)
+    assert resource.raw is None
+    resource.reader.close()
+
+
 @pytest.mark.parametrize(
     "query",
     [
@@ -206,3 +401,19 @@ def test_remove_null(input, expected):
 )
 def test_is_null(input, expected):
     assert io_utils.is_null(input) == expected
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("a", True),
+        ("a.b", True),
+        ("a.b.c", False),
+        ("a.c", False),
+        ("b.a", False),
+        ("x", False),
+    ],
+)
+def test_compile_check_data(path, expected):
+    entry = {"a": {"b": 1}}
+    assert io_utils.compile_check_data(path)(entry) is expected
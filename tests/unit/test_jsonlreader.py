@@ -1,4 +1,6 @@
 import gzip
+import math
+from io import StringIO
 from pathlib import Path
 
 import pytest
@@ -40,3 +42,57 @@ def test_required_property_missing():
         jsonl_reader = JSONLReader(zfin, config)
         with pytest.raises(ValueError):
             next(iter(jsonl_reader))
+
+
+def test_select_properties():
+    config = JSONLReaderConfig(
+        required_properties=["evidence.publicationId"],
+        select_properties=["objectId", "phenotypeStatement", "not_a_property"],
+    )
+
+    with gzip.open(test_zfin, "rt") as zfin:
+        row = next(iter(JSONLReader(zfin, config)))
+
+    assert row == {"objectId": "ZFIN:ZDB-GENE-011026-1", "phenotypeStatement": row["phenotypeStatement"]}
+
+
+def test_nested_required_property_missing():
+    config = JSONLReaderConfig(required_properties=["missing.publicationId"])
+
+    with gzip.open(test_zfin, "rt") as zfin:
+        with pytest.raises(ValueError, match="missing.publicationId"):
+            next(iter(JSONLReader(zfin, config)))
+
+
+def test_text_streams_and_lenient_values():
+    # Streams without an underlying binary buffer are read line by line
+    io_str = StringIO('{"a": 1}\n\n{"a": NaN, "b": 123456789012345678901234567890}\n')
+    io_str.name = "test.jsonl"
+
+    rows = list(JSONLReader(io_str, JSONLReaderConfig()))
+
+    assert rows[0] == {"a": 1}
+    assert math.isnan(rows[1]["a"])
+    assert rows[1]["b"] == 123456789012345678901234567890
+
+
+def test_binary_batches(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text("".join(f'{{"id": "X:{i}", "name": "é{i}"}}\n' for i in range(5000)))
+
+    with open(path, encoding="utf-8") as fh:
+        rows = list(JSONLReader(fh, JSONLReaderConfig()))
+
+    assert len(rows) == 5000
+    assert rows[-1] == {"id": "X:4999", "name": "é4999"}
+
+
+def test_mmap_matches_text_stream(tmp_path):
+    path = tmp_path / "zfin.jsonl"
+    with gzip.open(test_zfin, "rb") as zfin:
+        path.write_bytes(zfin.read())
+
+    with path.open() as fh:
+        expected = list(JSONLReader(fh, JSONLReaderConfig()))
+    with path.open() as fh:
+        assert list(JSONLReader(fh, JSONLReaderConfig(), raw=fh.buffer)) == expected
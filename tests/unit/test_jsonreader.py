@@ -1,10 +1,12 @@
 import gzip
+import json
+from io import StringIO
 from pathlib import Path
 
 import pytest
 
-from koza.io.reader.json_reader import JSONReader
-from koza.model.reader import JSONReaderConfig
+from koza.io.reader.json_reader import JSONReader, JSONStream, YAMLStream
+from koza.model.reader import JSONReaderConfig, YAMLReaderConfig
 
 test_zfin_data = Path(__file__).parents[1] / "resources" / "source-files" / "test_BGI_ZFIN.json.gz"
 
@@ -44,3 +46,106 @@ def test_required_property_missing():
         json_reader = JSONReader(zfin, config)
         with pytest.raises(ValueError):
             next(iter(json_reader))
+
+
+def test_streaming_matches_json_load():
+    with gzip.open(test_zfin_data, "rt") as zfin:
+        expected = list(JSONReader(zfin, JSONReaderConfig(json_path=json_path)))
+
+    config = JSONReaderConfig(
+        json_path=json_path,
+        required_properties=["name", "basicGeneticEntity.primaryId"],
+        streaming=True,
+    )
+    with gzip.open(test_zfin_data, "rt") as zfin:
+        assert list(JSONReader(zfin, config)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 1024])
+def test_json_stream(chunk_size):
+    document = '{"meta": {"skip": [1, {"a": "]"}]}, "rows" : [ {"n": 1}, {"n": 22.5e1}, {"n": [1,2]} ], "x": 1}'
+    stream = JSONStream(StringIO(document), chunk_size=chunk_size)
+
+    stream.walk(["rows"])
+
+    assert list(stream.items()) == [{"n": 1}, {"n": 225.0}, {"n": [1, 2]}]
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+@pytest.mark.parametrize("number", ["12.5", "-12.5", "1e5", "12.5E-3", "-7e+12", "123456"])
+def test_json_stream_numbers(chunk_size, number):
+    # Every chunk size cuts a number somewhere, e.g. right after its sign, "." or exponent
+    document = f'{{"version": {number}, "other": [{number}, {number}], "rows": [{{"n": {number}}}, {number}]}}'
+    stream = JSONStream(StringIO(document), chunk_size=chunk_size)
+
+    stream.walk(["rows"])
+
+    value = json.loads(number)
+    assert list(stream.items()) == [{"n": value}, value]
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ([], [{"a": [{"b": 1}, {"b": 2}]}]),
+        (["a"], [{"b": 1}, {"b": 2}]),
+        (["a", 1], [{"b": 2}]),
+    ],
+)
+def test_json_stream_paths(path, expected):
+    io_str = StringIO('{"a": [{"b": 1}, {"b": 2}]}')
+    io_str.name = "test.json"
+
+    rows = list(JSONReader(io_str, JSONReaderConfig(json_path=path, streaming=True)))
+
+    assert rows == expected
+
+
+def test_json_stream_missing_path():
+    with pytest.raises(KeyError):
+        JSONStream(StringIO('{"a": 1, "b": 2}')).walk(["c"])
+    with pytest.raises(IndexError):
+        JSONStream(StringIO('{"a": [1]}')).walk(["a", 1])
+
+
+def test_streaming_reads_lazily():
+    class CountingStringIO(StringIO):
+        chars_read = 0
+
+        def read(self, size=-1):
+            data = super().read(size)
+            self.chars_read += len(data)
+            return data
+
+    io_str = CountingStringIO('{"rows": [' + ", ".join(f'{{"n": {i}}}' for i in range(100_000)) + "]}")
+    io_str.name = "test.json"
+    reader = JSONReader(io_str, JSONReaderConfig(json_path=["rows"], streaming=True))
+    assert io_str.chars_read == 0
+
+    rows = iter(reader)
+    assert next(rows) == {"n": 0}
+    assert io_str.chars_read < len(io_str.getvalue())
+
+
+def test_yaml_streaming_multi_document():
+    document = "rows:\n  - {n: 1}\n  - {n: 2}\n---\nskip: [1, {a: b}]\nrows:\n  - {n: 3}\n"
+    io_str = StringIO(document)
+    io_str.name = "test.yaml"
+
+    rows = list(JSONReader(io_str, YAMLReaderConfig(json_path=["rows"], streaming=True)))
+
+    assert rows == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_yaml_streaming_matches_load():
+    document = "- &base {id: a, tags: [x, y]}\n- {id: b, date: 2020-01-01, <<: *base}\n"
+    expected = list(JSONReader(StringIO(document), YAMLReaderConfig()))
+
+    assert list(JSONReader(StringIO(document), YAMLReaderConfig(streaming=True))) == expected
+
+
+def test_yaml_stream_missing_path():
+    with pytest.raises(KeyError):
+        list(YAMLStream(StringIO("a: 1\nb: 2\n")).items(["c"]))
+    with pytest.raises(IndexError):
+        list(YAMLStream(StringIO("a: [1]\n")).items(["a", 1]))
@@ -31,3 +31,26 @@ def test_multiple_file_row_limit():
     row_count = len(list(source))
 
     assert row_count == 2
+
+
+def test_multiple_file_progress(monkeypatch):
+    config_file = ROOT_DIR / "examples/string/protein-links-detailed.yaml"
+    config, _ = KozaRunner.from_config_file(str(config_file), output_dir=str(OUTPUT_DIR))
+    reader_config = config.get_readers()[0].reader
+
+    bars = []
+    original = Source._progress_bar
+
+    def record_progress_bar(self, reader, resource):
+        pbar = original(self, reader, resource)
+        bars.append((pbar, resource))
+        return pbar
+
+    monkeypatch.setattr(Source, "_progress_bar", record_progress_bar)
+    source = Source(reader_config, base_directory=Path(config_file).parent, show_progress=True)
+
+    assert len(list(source)) == 15
+    assert len(bars) == 2
+    for pbar, resource in bars:
+        assert pbar.total == resource.size
+        assert pbar.n == resource.size
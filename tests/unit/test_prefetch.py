@@ -0,0 +1,59 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from koza.io.prefetch import Prefetcher
+from koza.model.reader import JSONLReaderConfig
+from koza.model.source import Source
+
+gzip_file = Path(__file__).parent.parent / "resources" / "source-files" / "ZFIN_PHENOTYPE_0.jsonl.gz"
+
+
+def test_yields_everything_in_order():
+    assert list(Prefetcher(range(2500), depth=2, batch_size=100)) == list(range(2500))
+
+
+def test_reraises_errors():
+    def failing():
+        yield 1
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError, match="boom"):
+        list(Prefetcher(failing(), depth=1))
+
+
+def test_close_stops_helper_thread():
+    prefetcher = Prefetcher(iter(range(10**9)), depth=2, batch_size=10)
+    iterator = iter(prefetcher)
+    assert next(iterator) == 0
+
+    iterator.close()
+    assert not any(thread.name == "koza-prefetch" for thread in threading.enumerate())
+
+
+def test_records_stall_time():
+    def slow():
+        for i in range(3):
+            time.sleep(0.05)
+            yield i
+
+    prefetcher = Prefetcher(slow(), depth=1, batch_size=1)
+    assert list(prefetcher) == [0, 1, 2]
+    assert prefetcher.stall_time >= 0.1
+
+
+def test_source_prefetch(tmp_path):
+    config = JSONLReaderConfig(files=[str(gzip_file)])
+    prefetched = Source(JSONLReaderConfig(files=[str(gzip_file)], prefetch=4), tmp_path)
+
+    assert list(prefetched) == list(Source(config, tmp_path))
+    assert prefetched.prefetch_stall_time >= 0
+
+
+def test_source_prefetch_with_row_limit(tmp_path):
+    source = Source(JSONLReaderConfig(files=[str(gzip_file)], prefetch=1), tmp_path, row_limit=3)
+
+    assert len(list(source)) == 3
+    assert not any(thread.name == "koza-prefetch" for thread in threading.enumerate())
@@ -1,15 +1,23 @@
+import os
+from collections import Counter
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
 import pytest
+from biolink_model.datamodel.pydanticmodel_v2 import Association, NamedThing
 from pydantic import TypeAdapter
 
 import koza
+from koza.io.writer.jsonl_writer import JSONLWriter
+from koza.io.writer.tsv_writer import TSVWriter
 from koza.io.writer.writer import KozaWriter
 from koza.model.formats import InputFormat
+from koza.model.graphs import KnowledgeGraph
 from koza.model.koza import KozaConfig
-from koza.runner import KozaRunner, KozaTransform, KozaTransformHooks
-from koza.utils.exceptions import NoTransformException
+from koza.model.writer import WriterConfig
+from koza.runner import KozaRunner, KozaTransform, KozaTransformHooks, load_transform, merge_transform_metadata
+from koza.utils.exceptions import NoTransformException, TransformWorkerError
 
 ROOT_DIR = Path(__file__).parent.parent.parent
 OUTPUT_DIR = ROOT_DIR / "tests/output"
@@ -253,3 +261,298 @@ def test_override_input_files_and_directory():
     readers = config.get_readers()
     assert readers[0].reader.files == ["/override_input_dir/foo.tsv", "/override_input_dir/bar.tsv"]
     assert readers[0].reader.format == InputFormat.csv
+
+
+def _edge_records(n: int) -> list[dict[str, Any]]:
+    return [{"a": f"X:{i}", "b": f"X:{i + 1}"} for i in range(n)]
+
+
+@koza.transform_record()
+def _edge_transform_record(koza: KozaTransform, record: dict[str, Any]):
+    koza.state["count"] += 1
+    return KnowledgeGraph(
+        nodes=[NamedThing(id=record["a"], category=["biolink:NamedThing"])],
+        edges=[
+            Association(
+                id=f"uuid:{record['a']}",
+                subject=record["a"],
+                predicate="biolink:related_to",
+                object=record["b"],
+                knowledge_level="not_provided",
+                agent_type="not_provided",
+            )
+        ],
+    )
+
+
+@koza.on_data_begin()
+def _start_count(koza: KozaTransform):
+    koza.state["count"] = 0
+
+
+@koza.on_data_end()
+def _record_count(koza: KozaTransform):
+    koza.transform_metadata["counts"] = Counter(records=koza.state["count"])
+    koza.transform_metadata["version"] = 2024
+    koza.transform_metadata["worker_counts"] = {str(os.getpid()): koza.state["count"]}
+
+
+@pytest.mark.parametrize("writer_cls", [TSVWriter, JSONLWriter])
+def test_run_serial_in_workers(tmp_path, writer_cls):
+    writer_config = WriterConfig(node_properties=["id", "category"], edge_properties=["id", "subject", "object"])
+    writer = writer_cls(str(tmp_path), "workers", writer_config)
+
+    runner = KozaRunner(
+        data=_edge_records(2500),
+        writer=writer,
+        hooks=KozaTransformHooks(
+            transform_record=[_edge_transform_record],
+            on_data_begin=[_start_count],
+            on_data_end=[_record_count],
+        ),
+        workers=3,
+    )
+    runner.run()
+
+    assert writer.node_count == 2500
+    assert writer.edge_count == 2500
+    # Every worker ran its own begin/end hooks, and together they saw every record
+    assert runner.transform_metadata["counts"] == Counter(records=2500)
+    assert runner.transform_metadata["version"] == 2024
+    assert len(runner.transform_metadata["worker_counts"]) == 3
+    assert sum(runner.transform_metadata["worker_counts"].values()) == 2500
+
+    suffix = "tsv" if writer_cls is TSVWriter else "jsonl"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"workers_edges.{suffix}", f"workers_nodes.{suffix}"]
+    with open(tmp_path / f"workers_edges.{suffix}") as fh:
+        lines = fh.readlines()
+    header_lines = 1 if writer_cls is TSVWriter else 0
+    assert len(lines) == 2500 + header_lines
+
+
+def test_run_serial_in_workers_dedupes_jsonl_nodes(tmp_path):
+    writer = JSONLWriter(str(tmp_path), "workers", WriterConfig())
+    records = [{"a": "X:1", "b": f"X:{i}"} for i in range(3000)]
+
+    runner = KozaRunner(
+        data=records,
+        writer=writer,
+        hooks=KozaTransformHooks(
+            transform_record=[_edge_transform_record],
+            on_data_begin=[_start_count],
+        ),
+        workers=2,
+    )
+    runner.run()
+
+    assert writer.node_count == 1
+    assert writer.edge_count == 3000
+
+
+@koza.transform_record()
+def _failing_transform_record(koza: KozaTransform, record: dict[str, Any]):
+    raise KeyError("no such column")
+
+
+def test_worker_errors_are_raised(tmp_path):
+    writer = JSONLWriter(str(tmp_path), "workers", WriterConfig())
+    runner = KozaRunner(
+        data=_edge_records(10),
+        writer=writer,
+        hooks=KozaTransformHooks(transform_record=[_failing_transform_record]),
+        workers=2,
+    )
+
+    with pytest.raises(TransformWorkerError, match="no such column"):
+        runner.run()
+
+
+def test_workers_require_transform_record(tmp_path):
+    @koza.transform()
+    def transform(koza: KozaTransform, data):
+        yield from data
+
+    runner = KozaRunner(
+        data=[],
+        writer=JSONLWriter(str(tmp_path), "workers", WriterConfig()),
+        hooks=KozaTransformHooks(transform=[transform]),
+        workers=2,
+    )
+
+    with pytest.raises(ValueError, match="requires `@koza.transform_record`"):
+        runner.run()
+
+
+def test_run_tags_concurrently():
+    writer = MockWriter()
+
+    @koza.transform_record()
+    def transform_record(koza: KozaTransform, record: dict[str, Any]):
+        koza.write(record)
+
+    runner = KozaRunner(
+        data={
+            "a": [{"tag": "a", "n": i} for i in range(1500)],
+            "b": [{"tag": "b", "n": i} for i in range(1500)],
+        },
+        writer=writer,
+        hooks={
+            "a": KozaTransformHooks(transform_record=[transform_record]),
+            "b": KozaTransformHooks(transform_record=[transform_record]),
+        },
+        tag_workers=2,
+    )
+    runner.run()
+
+    assert len(writer.items) == 3000
+    for tag in ("a", "b"):
+        assert [item["n"] for item in writer.items if item["tag"] == tag] == list(range(1500))
+    assert set(runner.tag_timings) == {"a", "b"}
+
+
+def test_tag_errors_are_raised():
+    @koza.transform_record()
+    def transform_record(koza: KozaTransform, record: dict[str, Any]):
+        koza.write(record)
+
+    runner = KozaRunner(
+        data={"a": [{"a": 1}], "b": [{"b": 1}]},
+        writer=MockWriter(),
+        hooks={
+            "a": KozaTransformHooks(transform_record=[transform_record]),
+            "b": KozaTransformHooks(transform_record=[_failing_transform_record]),
+        },
+        tag_workers=2,
+    )
+
+    with pytest.raises(KeyError, match="no such column"):
+        runner.run()
+
+
+def test_tag_workers_cannot_be_combined_with_workers():
+    with pytest.raises(ValueError, match="Cannot combine"):
+        KozaRunner(data=[], writer=MockWriter(), hooks=KozaTransformHooks(), workers=2, tag_workers=2)
+
+
+def test_run_batch():
+    data = [{"a": i} for i in range(5)]
+    writer = MockWriter()
+    batches = []
+
+    @koza.transform_batch(batch_size=2)
+    def transform_batch(koza: KozaTransform, records: list[dict[str, Any]]):
+        batches.append(len(records))
+        return [{"a": record["a"] * 10} for record in records]
+
+    runner = KozaRunner(
+        data=data,
+        writer=writer,
+        hooks=KozaTransformHooks(transform_batch=[transform_batch]),
+    )
+    runner.run()
+
+    assert batches == [2, 2, 1]
+    assert writer.items == [{"a": 0}, {"a": 10}, {"a": 20}, {"a": 30}, {"a": 40}]
+
+
+def test_run_batch_columnar_with_prepare_data():
+    data = [{"a": 1, "b": 2}, {"a": 3}]
+    writer = MockWriter()
+
+    @koza.prepare_data()
+    def prepare(koza: KozaTransform, data):
+        for record in data:
+            yield {**record, "c": "x"}
+
+    @koza.transform_batch(columnar=True)
+    def transform_batch(koza: KozaTransform, columns: dict[str, list[Any]]):
+        koza.write(columns)
+
+    runner = KozaRunner(
+        data=data,
+        writer=writer,
+        hooks=KozaTransformHooks(prepare_data=[prepare], transform_batch=[transform_batch]),
+    )
+    runner.run()
+
+    assert writer.items == [{"a": [1, 3], "b": [2, None], "c": ["x", "x"]}]
+
+
+@koza.transform_batch(batch_size=100)
+def _edge_transform_batch(koza: KozaTransform, records: list[dict[str, Any]]):
+    return KnowledgeGraph(edges=[_edge_transform_record(koza, record).edges[0] for record in records])
+
+
+def test_run_batch_in_workers(tmp_path):
+    writer = JSONLWriter(str(tmp_path), "workers", WriterConfig())
+    runner = KozaRunner(
+        data=_edge_records(1050),
+        writer=writer,
+        hooks=KozaTransformHooks(
+            transform_batch=[_edge_transform_batch],
+            on_data_begin=[_start_count],
+            on_data_end=[_record_count],
+        ),
+        workers=2,
+    )
+    runner.run()
+
+    assert writer.edge_count == 1050
+    assert runner.transform_metadata["counts"] == Counter(records=1050)
+    assert runner.transform_metadata["version"] == 2024
+
+
+def test_only_one_kind_of_transform_fn():
+    @koza.transform_record()
+    def transform_record(koza: KozaTransform, record: dict[str, Any]):
+        koza.write(record)
+
+    @koza.transform_batch()
+    def transform_batch(koza: KozaTransform, records: list[dict[str, Any]]):
+        return records
+
+    runner = KozaRunner(
+        data=[],
+        writer=MockWriter(),
+        hooks=KozaTransformHooks(transform_record=[transform_record], transform_batch=[transform_batch]),
+    )
+
+    with pytest.raises(ValueError, match="Can only define one of"):
+        runner.run()
+
+
+def test_load_transform_batch():
+    module = ModuleType("batch_transform")
+    module.transform_rows = koza.transform_batch(tag="a", batch_size=10)(lambda koza, records: records)
+
+    hooks = load_transform(module)
+
+    assert hooks["a"].transform_batch[0].batch_size == 10
+
+
+def test_merge_transform_metadata():
+    metadata = {"counts": Counter(gene=1), "nested": {"rows": Counter(x=1)}, "sources": ["a"], "version": "1"}
+    merge_transform_metadata(metadata, {"counts": Counter(gene=2, disease=0), "nested": {"rows": Counter(y=1)}})
+    merge_transform_metadata(metadata, {"version": "1", "flag": True, "sources": ["a"]})
+    merge_transform_metadata(metadata, {"flag": True, "new": None})
+
+    assert metadata == {
+        "counts": Counter(gene=3, disease=0),
+        "nested": {"rows": Counter(x=1, y=1)},
+        "sources": ["a"],
+        "version": "1",
+        "flag": True,
+        "new": None,
+    }
+
+
+def test_merge_transform_metadata_keeps_scalars():
+    metadata = {}
+    for _ in range(3):
+        merge_transform_metadata(metadata, {"year": 2024, "max_score": 0.9, "sources": ["a"]})
+
+    # Plain numbers aren't counts: the same value from every worker is left as it is
+    assert metadata == {"year": 2024, "max_score": 0.9, "sources": ["a"]}
+
+    merge_transform_metadata(metadata, {"year": 2025, "sources": ["b"]})
+    assert metadata == {"year": 2024, "max_score": 0.9, "sources": ["a"]}
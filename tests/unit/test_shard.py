@@ -0,0 +1,142 @@
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from koza.io.utils import open_resource
+from koza.model.formats import OutputFormat
+from koza.model.reader import CSVReaderConfig
+from koza.model.source import Source
+from koza.runner import KozaRunner
+from koza.utils.shard import Shard
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+
+
+@pytest.mark.parametrize("value, expected", [("0/1", Shard(0, 1)), ("3/4", Shard(3, 4))])
+def test_parse(value, expected):
+    assert Shard.parse(value) == expected
+
+
+@pytest.mark.parametrize("value", ["1", "a/b", "4/4", "-1/2", "0/0", "1/2/3"])
+def test_parse_invalid(value):
+    with pytest.raises(ValueError):
+        Shard.parse(value)
+
+
+def test_value_assignment_is_stable():
+    # CRC32-based, so this must never change between runs or machines
+    assert [Shard(i, 3).includes_value("NCBITaxon:9606") for i in range(3)] == [False, False, True]
+
+
+def _write_files(tmp_path: Path, count: int) -> list[str]:
+    files = []
+    for i in range(count):
+        path = tmp_path / f"part-{i}.tsv"
+        path.write_text("id\tgroup\n" + "".join(f"{i}-{j}\tg{j % 5}\n" for j in range(10)))
+        files.append(str(path))
+    return files
+
+
+def test_file_sharding(tmp_path):
+    config = CSVReaderConfig(files=_write_files(tmp_path, 5))
+
+    shards = [Source(config, tmp_path, shard=Shard(i, 2)) for i in range(2)]
+    rows = [[row["id"] for row in source] for source in shards]
+
+    assert shards[0].resource_names == [config.files[0], config.files[2], config.files[4]]
+    assert shards[1].resource_names == [config.files[1], config.files[3]]
+    assert len(rows[0]) == 30
+    assert len(rows[1]) == 20
+    assert not set(rows[0]) & set(rows[1])
+
+
+def test_file_sharding_skips_other_shards_files(tmp_path):
+    config = CSVReaderConfig(files=_write_files(tmp_path, 5))
+
+    with patch("koza.model.source.open_resource", wraps=open_resource) as opened:
+        rows = list(Source(config, tmp_path, shard=Shard(1, 2)))
+
+    assert len(rows) == 20
+    assert [call.args[0] for call in opened.call_args_list] == [Path(config.files[1]), Path(config.files[3])]
+
+
+def test_file_sharding_with_archive(tmp_path):
+    files = _write_files(tmp_path, 2)
+    archive = ROOT_DIR / "tests/resources/source-files/string-split.tar.gz"
+    # Each member of an archive takes a position, even though it's a single file in the list
+    config = CSVReaderConfig(files=[files[0], str(archive), files[1]])
+
+    shards = [Source(config, tmp_path, shard=Shard(i, 2)) for i in range(2)]
+    for source in shards:
+        list(source)
+
+    assert shards[0].resource_names == [files[0], "string-b.tsv"]
+    assert shards[1].resource_names == ["string-a.tsv", files[1]]
+
+
+def test_row_sharding(tmp_path):
+    config = CSVReaderConfig(files=_write_files(tmp_path, 2), shard_key="group")
+
+    shards = [list(Source(config, tmp_path, shard=Shard(i, 3))) for i in range(3)]
+
+    assert sum(len(rows) for rows in shards) == 20
+    # Every row with the same key ends up in the same shard
+    groups = [{row["group"] for row in rows} for rows in shards]
+    assert sum(len(g) for g in groups) == 5
+    assert not groups[0] & groups[1] and not groups[1] & groups[2] and not groups[0] & groups[2]
+
+
+def test_missing_shard_key(tmp_path):
+    config = CSVReaderConfig(files=_write_files(tmp_path, 1), shard_key="nope")
+
+    with pytest.raises(ValueError, match="Shard key `nope` is missing"):
+        list(Source(config, tmp_path, shard=Shard(0, 2)))
+
+
+def test_shard_key_must_be_selected():
+    with pytest.raises(ValueError, match="Shard key 'group' must be one of the selected columns"):
+        CSVReaderConfig(shard_key="group", select_columns=["id"])
+
+    CSVReaderConfig(shard_key="group", select_columns=["id", "group"])
+
+
+def test_row_sharding_with_selected_columns(tmp_path):
+    config = CSVReaderConfig(files=_write_files(tmp_path, 2), shard_key="group", select_columns=["group"])
+
+    shards = [list(Source(config, tmp_path, shard=Shard(i, 3))) for i in range(3)]
+
+    assert sum(len(rows) for rows in shards) == 20
+    assert all(list(row) == ["group"] for rows in shards for row in rows)
+
+
+def test_sharded_runner_outputs(tmp_path):
+    config_file = ROOT_DIR / "examples/string-declarative/declarative-protein-links-detailed.yaml"
+
+    edge_count = 0
+    for i in range(2):
+        config, runner = KozaRunner.from_config_file(
+            str(config_file),
+            output_dir=str(tmp_path),
+            output_format=OutputFormat.jsonl,
+            shard=Shard(i, 2),
+        )
+        runner.run()
+        edge_count += runner.writer.edge_count
+
+        manifest_path = tmp_path / f"{config.name}_manifest.shard-{i}.json"
+        manifest = json.loads(manifest_path.read_text())
+        assert manifest["shard"] == {"index": i, "count": 2}
+        assert [Path(f).name for f in manifest["inputs"][0]["files"]] == [["string.tsv", "string2.tsv"][i]]
+        assert manifest["outputs"] == [
+            str(tmp_path / f"{config.name}_nodes.shard-{i}.jsonl"),
+            str(tmp_path / f"{config.name}_edges.shard-{i}.jsonl"),
+        ]
+        assert manifest["edge_count"] == runner.writer.edge_count
+
+    _, unsharded = KozaRunner.from_config_file(
+        str(config_file), output_dir=str(tmp_path / "all"), output_format=OutputFormat.jsonl
+    )
+    unsharded.run()
+    assert edge_count == unsharded.writer.edge_count
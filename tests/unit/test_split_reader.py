@@ -0,0 +1,71 @@
+import io
+import json
+from pathlib import Path
+
+from koza.io.reader.split_reader import byte_ranges
+from koza.model.reader import CSVReaderConfig, JSONLReaderConfig
+from koza.model.source import Source
+
+
+def test_byte_ranges_end_on_newlines():
+    data = b"".join(f"line {i}\n".encode() for i in range(100))
+    ranges = byte_ranges(io.BytesIO(data), 0, len(data), 50)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (next_start, _) in zip(ranges, ranges[1:], strict=False):
+        assert end == next_start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_byte_ranges_boundary_on_newline():
+    data = b"aaaa\nbbbb\ncccc\n"
+    assert byte_ranges(io.BytesIO(data), 0, len(data), 5) == [(0, 5), (5, 10), (10, 15)]
+
+
+def _write_tsv(path: Path, rows: int) -> Path:
+    with path.open("w") as fh:
+        fh.write("# a comment before the header\n")
+        fh.write("id\tscore\n")
+        for i in range(rows):
+            fh.write(f"row-{i}\t{i % 10}\n")
+    return path
+
+
+def test_split_csv_matches_serial(tmp_path):
+    path = _write_tsv(tmp_path / "data.tsv", 5000)
+    serial = list(Source(CSVReaderConfig(files=[str(path)], columns=["id", {"score": "int"}]), tmp_path))
+    split = list(
+        Source(
+            CSVReaderConfig(files=[str(path)], columns=["id", {"score": "int"}], split_workers=3, split_size=4096),
+            tmp_path,
+        )
+    )
+
+    assert len(serial) == 5000
+    assert split == serial
+
+
+def test_split_csv_unordered_with_filter(tmp_path):
+    path = _write_tsv(tmp_path / "data.tsv", 5000)
+    config = CSVReaderConfig(
+        files=[str(path)],
+        columns=["id", {"score": "int"}],
+        filters=[{"column": "score", "inclusion": "include", "filter_code": "lt", "value": 3}],
+        split_workers=2,
+        split_size=2048,
+        preserve_order=False,
+    )
+    rows = list(Source(config, tmp_path))
+
+    assert len(rows) == 1500
+    assert {row["id"] for row in rows} == {f"row-{i}" for i in range(5000) if i % 10 < 3}
+
+
+def test_split_jsonl_with_row_limit(tmp_path):
+    path = tmp_path / "data.jsonl"
+    path.write_text("".join(json.dumps({"id": i}) + "\n" for i in range(2000)))
+    config = JSONLReaderConfig(files=[str(path)], split_workers=2, split_size=1024)
+
+    assert [row["id"] for row in Source(config, tmp_path)] == list(range(2000))
+    assert [row["id"] for row in Source(config, tmp_path, row_limit=10)] == list(range(10))